@@ -0,0 +1,73 @@
+"""Add trigger-maintained full-text search vector to chunks with GIN index
+
+Revision ID: 3d8b6f1e0a57
+Revises: e7f2a9c4b815
+Create Date: 2025-10-10 15:32:07.518264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8b6f1e0a57'
+down_revision: Union[str, Sequence[str], None] = 'e7f2a9c4b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows per backfill UPDATE, each committed on its own
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A nullable column without a default is a catalog-only change. A stored generated
+    # column would rewrite the whole table under an ACCESS EXCLUSIVE lock.
+    op.add_column('chunks', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Keep the column in sync for new and edited chunks (COPY fires row triggers too)
+    op.execute(
+        "CREATE OR REPLACE FUNCTION chunks_search_vector_update() RETURNS trigger AS $$ "
+        "BEGIN "
+        "NEW.search_vector := to_tsvector('english'::regconfig, NEW.chunk_text); "
+        "RETURN NEW; "
+        "END "
+        "$$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER chunks_search_vector_update "
+        "BEFORE INSERT OR UPDATE OF chunk_text ON chunks "
+        "FOR EACH ROW EXECUTE FUNCTION chunks_search_vector_update()"
+    )
+
+    # Commit the trigger, then backfill existing rows in short transactions by id range
+    # and build the index without blocking writes to chunks
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text("SELECT max(id) FROM chunks")).scalar() or 0
+        for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    "UPDATE chunks SET search_vector = to_tsvector('english'::regconfig, chunk_text) "
+                    "WHERE id > :start AND id <= :end AND search_vector IS NULL"
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH_SIZE}
+            )
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_search_vector_active "
+            "ON chunks USING gin (search_vector) WHERE active"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_search_vector_active")
+
+    op.execute("DROP TRIGGER IF EXISTS chunks_search_vector_update ON chunks")
+    op.execute("DROP FUNCTION IF EXISTS chunks_search_vector_update()")
+    op.drop_column('chunks', 'search_vector')
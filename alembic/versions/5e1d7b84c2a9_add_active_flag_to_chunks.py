@@ -0,0 +1,81 @@
+"""Add denormalized active flag to chunks with partial ANN index
+
+Revision ID: 5e1d7b84c2a9
+Revises: a3c91f0d52e7
+Create Date: 2025-10-07 10:41:52.903117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1d7b84c2a9'
+down_revision: Union[str, Sequence[str], None] = 'a3c91f0d52e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# HNSW is available from pgvector 0.5.0 onwards
+HNSW_MIN_VERSION = (0, 5, 0)
+
+# IVFFlat recommends roughly rows / 1000 lists for up to 1M rows
+IVFFLAT_ROWS_PER_LIST = 1000
+IVFFLAT_MIN_LISTS = 10
+
+
+def _pgvector_version() -> tuple:
+    """Return the installed pgvector extension version as a tuple of ints."""
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    if not version:
+        return (0, 0, 0)
+    return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+
+def _ann_index_statement(partial: bool) -> str:
+    """Build the CREATE INDEX statement for the best ANN index this database supports."""
+    where = " WHERE active" if partial else ""
+    suffix = "_active" if partial else ""
+    if _pgvector_version() >= HNSW_MIN_VERSION:
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_embedding_hnsw{suffix} "
+            "ON chunks USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = 16, ef_construction = 64){where}"
+        )
+    row_count = op.get_bind().execute(sa.text(f"SELECT count(*) FROM chunks{where}")).scalar() or 0
+    lists = max(row_count // IVFFLAT_ROWS_PER_LIST, IVFFLAT_MIN_LISTS)
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_embedding_ivfflat{suffix} "
+        f"ON chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists}){where}"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chunks', sa.Column('active', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+
+    # Copy the current transcript state onto existing chunks
+    op.execute(
+        "UPDATE chunks SET active = false "
+        "FROM transcripts "
+        "WHERE chunks.transcript_id = transcripts.id AND NOT transcripts.active"
+    )
+
+    # Commit the backfill so the concurrent index build below can see it
+    with op.get_context().autocommit_block():
+        op.execute(_ann_index_statement(partial=True))
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_hnsw")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_ivfflat")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(_ann_index_statement(partial=False))
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_hnsw_active")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_ivfflat_active")
+
+    op.drop_column('chunks', 'active')
@@ -0,0 +1,64 @@
+"""Add approximate nearest neighbour index on chunk embeddings
+
+Revision ID: a3c91f0d52e7
+Revises: 69acde1cae25
+Create Date: 2025-10-06 14:12:37.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91f0d52e7'
+down_revision: Union[str, Sequence[str], None] = '69acde1cae25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# HNSW is available from pgvector 0.5.0 onwards
+HNSW_MIN_VERSION = (0, 5, 0)
+
+# IVFFlat recommends roughly rows / 1000 lists for up to 1M rows
+IVFFLAT_ROWS_PER_LIST = 1000
+IVFFLAT_MIN_LISTS = 10
+
+
+def _pgvector_version() -> tuple:
+    """Return the installed pgvector extension version as a tuple of ints."""
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    if not version:
+        return (0, 0, 0)
+    return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _pgvector_version() >= HNSW_MIN_VERSION:
+        statement = (
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_embedding_hnsw "
+            "ON chunks USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+    else:
+        # IVFFlat clusters the existing rows, so size the list count from the table
+        row_count = op.get_bind().execute(sa.text("SELECT count(*) FROM chunks")).scalar() or 0
+        lists = max(row_count // IVFFLAT_ROWS_PER_LIST, IVFFLAT_MIN_LISTS)
+        statement = (
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_embedding_ivfflat "
+            f"ON chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists})"
+        )
+
+    # Build without blocking writes to chunks; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_hnsw")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_embedding_ivfflat")
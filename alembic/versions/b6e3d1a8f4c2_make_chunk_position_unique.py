@@ -0,0 +1,50 @@
+"""Make (transcript_id, chunk_index) unique on chunks
+
+Revision ID: b6e3d1a8f4c2
+Revises: 3d8b6f1e0a57
+Create Date: 2025-10-14 09:18:44.271930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e3d1a8f4c2'
+down_revision: Union[str, Sequence[str], None] = '3d8b6f1e0a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Drop duplicates left by ingestion jobs that ran twice, keeping the first copy of each chunk
+    op.execute(
+        "DELETE FROM chunks AS duplicate "
+        "USING chunks AS original "
+        "WHERE duplicate.transcript_id = original.transcript_id "
+        "AND duplicate.chunk_index = original.chunk_index "
+        "AND duplicate.id > original.id"
+    )
+
+    # Commit the cleanup, then swap the index without blocking writes to chunks
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_transcript_chunk_unique "
+            "ON chunks (transcript_id, chunk_index)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_transcript_chunk")
+    op.execute("ALTER INDEX ix_chunks_transcript_chunk_unique RENAME TO ix_chunks_transcript_chunk")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_transcript_chunk_plain "
+            "ON chunks (transcript_id, chunk_index)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_transcript_chunk")
+    op.execute("ALTER INDEX ix_chunks_transcript_chunk_plain RENAME TO ix_chunks_transcript_chunk")
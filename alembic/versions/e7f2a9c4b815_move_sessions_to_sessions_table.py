@@ -0,0 +1,75 @@
+"""Move sessions from users.session_key to a sessions table
+
+Revision ID: e7f2a9c4b815
+Revises: 9b2e7d3f4a61
+Create Date: 2025-10-10 09:14:22.381046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f2a9c4b815'
+down_revision: Union[str, Sequence[str], None] = '9b2e7d3f4a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches AuthService.SESSION_EXPIRATION_HOURS at the time of the migration
+SESSION_EXPIRATION_HOURS = 24
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_key', sa.String(length=255), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sessions_id'), 'sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_sessions_session_key'), 'sessions', ['session_key'], unique=True)
+    op.create_index(op.f('ix_sessions_user_id'), 'sessions', ['user_id'], unique=False)
+    op.create_index(op.f('ix_sessions_expires_at'), 'sessions', ['expires_at'], unique=False)
+
+    # Carry over sessions that are still valid so nobody is logged out by the deploy
+    op.execute(f"""
+        INSERT INTO sessions (session_key, user_id, created_at, expires_at)
+        SELECT session_key, id, updated_at, updated_at + interval '{SESSION_EXPIRATION_HOURS} hours'
+        FROM users
+        WHERE session_key IS NOT NULL
+          AND updated_at + interval '{SESSION_EXPIRATION_HOURS} hours' > (now() at time zone 'utc')
+    """)
+
+    op.drop_index(op.f('ix_users_session_key'), table_name='users')
+    op.drop_column('users', 'session_key')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('users', sa.Column('session_key', sa.String(length=255), nullable=True))
+    op.create_index(op.f('ix_users_session_key'), 'users', ['session_key'], unique=True)
+
+    # Keep each user's most recent live session
+    op.execute("""
+        UPDATE users
+        SET session_key = latest.session_key
+        FROM (
+            SELECT DISTINCT ON (user_id) user_id, session_key
+            FROM sessions
+            WHERE expires_at > (now() at time zone 'utc')
+            ORDER BY user_id, created_at DESC
+        ) AS latest
+        WHERE users.id = latest.user_id
+    """)
+
+    op.drop_index(op.f('ix_sessions_expires_at'), table_name='sessions')
+    op.drop_index(op.f('ix_sessions_user_id'), table_name='sessions')
+    op.drop_index(op.f('ix_sessions_session_key'), table_name='sessions')
+    op.drop_index(op.f('ix_sessions_id'), table_name='sessions')
+    op.drop_table('sessions')
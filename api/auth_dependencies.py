@@ -6,10 +6,11 @@ import traceback
 import os
 from fastapi import HTTPException, Depends, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from config.db_config import get_db
-from models.user import User, AccessLevel
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db_config import get_async_db
+from models.user import AccessLevel
 from services.auth_service import AuthService
+from services.session_cache import SessionUser
 
 # Security scheme for API documentation
 security = HTTPBearer(auto_error=False)
@@ -38,10 +39,10 @@ def get_cookie_security_settings():
     return settings
 
 
-def get_current_user(
+async def get_current_user(
     request: Request,
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> SessionUser:
     """
     Get the current authenticated user from session cookie.
     
@@ -66,7 +67,7 @@ def get_current_user(
         )
     
     # Get user by session key
-    user = AuthService.get_user_by_session(db, session_key)
+    user = await AuthService.get_user_by_session(db, session_key)
     
     if not user:
         traceback.print_exc()
@@ -79,10 +80,10 @@ def get_current_user(
     return user
 
 
-def get_current_user_optional(
+async def get_current_user_optional(
     request: Request,
-    db: Session = Depends(get_db)
-) -> User | None:
+    db: AsyncSession = Depends(get_async_db)
+) -> SessionUser | None:
     """
     Get the current authenticated user from session cookie (optional).
     
@@ -98,7 +99,7 @@ def get_current_user_optional(
     if not session_key:
         return None
     
-    return AuthService.get_user_by_session(db, session_key)
+    return await AuthService.get_user_by_session(db, session_key)
 
 
 def require_access_level(required_level: AccessLevel):
@@ -111,9 +112,9 @@ def require_access_level(required_level: AccessLevel):
     Returns:
         Dependency function
     """
-    def access_level_dependency(
-        current_user: User = Depends(get_current_user)
-    ) -> User:
+    async def access_level_dependency(
+        current_user: SessionUser = Depends(get_current_user)
+    ) -> SessionUser:
         if not AuthService.require_access_level(current_user, required_level):
             print(f"Access denied: User {current_user.email} (level: {current_user.access_level}) attempted to access {required_level.value} endpoint")
             traceback.print_exc()
@@ -126,9 +127,9 @@ def require_access_level(required_level: AccessLevel):
     return access_level_dependency
 
 
-def require_admin_access(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def require_admin_access(
+    current_user: SessionUser = Depends(get_current_user)
+) -> SessionUser:
     """
     Require admin or super admin access.
     
@@ -150,9 +151,9 @@ def require_admin_access(
     return current_user
 
 
-def require_super_admin_access(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def require_super_admin_access(
+    current_user: SessionUser = Depends(get_current_user)
+) -> SessionUser:
     """
     Require super admin access.
     
@@ -175,9 +176,9 @@ def require_super_admin_access(
     return current_user
 
 
-def require_query_permission(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def require_query_permission(
+    current_user: SessionUser = Depends(get_current_user)
+) -> SessionUser:
     """
     Require query permission.
     
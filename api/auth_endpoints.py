@@ -4,10 +4,12 @@ Authentication API endpoints.
 
 import traceback
 from fastapi import APIRouter, HTTPException, Depends, Response
-from sqlalchemy.orm import Session
-from config.db_config import get_db
-from models.user import User, AccessLevel
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db_config import get_async_db
+from models.user import AccessLevel
+from services.session_cache import SessionUser
 from services.auth_service import AuthService
+from services.password_hasher import PasswordHasherBusy
 from api.schemas import (
     UserRegister, 
     UserLogin, 
@@ -24,15 +26,15 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.options("/{path:path}")
-def options_handler(path: str):
+async def options_handler(path: str):
     """Handle preflight OPTIONS requests for CORS."""
     return {"message": "OK"}
 
 
 @router.post("/register", response_model=UserResponse)
-def register_user(
+async def register_user(
     user_data: UserRegister,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user.
@@ -49,7 +51,7 @@ def register_user(
     """
     try:
         # Create new user
-        user = AuthService.create_user(
+        user = await AuthService.create_user(
             db=db,
             first_name=user_data.first_name,
             last_name=user_data.last_name,
@@ -75,6 +77,9 @@ def register_user(
         print(f"ValueError in register_user: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordHasherBusy as e:
+        print(f"PasswordHasherBusy in register_user: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         print(f"Unexpected error in register_user: {str(e)}")
         traceback.print_exc()
@@ -82,10 +87,10 @@ def register_user(
 
 
 @router.post("/login", response_model=UserResponse)
-def login_user(
+async def login_user(
     login_data: UserLogin,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate user and create session.
@@ -103,7 +108,7 @@ def login_user(
     """
     try:
         # Authenticate user
-        user = AuthService.authenticate_user(
+        user = await AuthService.authenticate_user(
             db=db,
             email=login_data.email,
             password=login_data.password
@@ -116,7 +121,7 @@ def login_user(
             )
         
         # Login user and get session info
-        session_key, session_expires_at = AuthService.login_user(db, user)
+        session_key, session_expires_at = await AuthService.login_user(db, user)
         
         # Set secure HTTP-only cookie
         set_session_cookie(response, session_key)
@@ -135,6 +140,9 @@ def login_user(
         
     except HTTPException:
         raise
+    except PasswordHasherBusy as e:
+        print(f"PasswordHasherBusy in login_user: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         print(f"Unexpected error in login_user: {str(e)}")
         traceback.print_exc()
@@ -142,10 +150,10 @@ def login_user(
 
 
 @router.post("/logout", response_model=LogoutResponse)
-def logout_user(
+async def logout_user(
     response: Response,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: SessionUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Log out current user and clear session.
@@ -160,7 +168,7 @@ def logout_user(
     """
     try:
         # Clear user session in database
-        AuthService.logout_user(db, current_user)
+        await AuthService.logout_user(db, current_user)
         
         # Clear session cookie
         clear_session_cookie(response)
@@ -174,8 +182,8 @@ def logout_user(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+async def get_current_user_info(
+    current_user: SessionUser = Depends(get_current_user)
 ):
     """
     Get current authenticated user information.
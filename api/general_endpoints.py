@@ -2,18 +2,27 @@
 General API endpoints (health, root, etc.).
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from api.auth_dependencies import require_admin_access
+from services.session_cache import SessionUser
+from services.metrics import Metrics
 
 router = APIRouter(tags=["general"])
 
 
 @router.get("/")
-def read_root():
+async def read_root():
     """Root endpoint."""
     return {"message": "Hello World"}
 
 
 @router.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@router.get("/metrics")
+async def get_metrics(current_user: SessionUser = Depends(require_admin_access)):
+    """In-process metrics for this worker (counters and summaries)."""
+    return Metrics.snapshot()
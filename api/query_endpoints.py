@@ -3,35 +3,43 @@ Query-related API endpoints.
 """
 
 import traceback
+import json
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from config.db_config import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db_config import get_async_db
 from services.query_service import QueryService
 from api.schemas import QueryRequest
 from api.auth_dependencies import require_query_permission
-from models.user import User
+from services.session_cache import SessionUser
 
 router = APIRouter(tags=["query"])
 
 
 @router.post("/query")
-def query_documents(
+async def query_documents(
     request: QueryRequest, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_query_permission)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_query_permission)
 ):
     """
     Query documents using semantic search.
     
     Args:
-        request: QueryRequest containing the search question
+        request: QueryRequest containing the search question and optional retrieval knobs
         db: Database session
         
     Returns:
         Query response with answer
     """
     try:
-        answer = QueryService.process_query(request.question, db)
+        answer = await QueryService.process_query(
+            request.question,
+            db,
+            ef_search=request.ef_search,
+            probes=request.probes,
+            mmr_lambda=request.mmr_lambda
+        )
         return {
             "question": request.question,
             "answer": answer,
@@ -46,3 +54,68 @@ def query_documents(
             status_code=500,
             detail=f"Error processing query: {str(e)}"
         )
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_events(prepared: dict):
+    """Turn QueryService.stream_answer output into SSE messages, reporting failures as an error event."""
+    try:
+        async for event, data in QueryService.stream_answer(prepared):
+            yield _format_sse(event, data)
+    except Exception as e:
+        print(f"Unexpected error while streaming query answer: {str(e)}")
+        traceback.print_exc()
+        yield _format_sse("error", {"detail": f"Error processing query: {str(e)}"})
+
+
+@router.post("/query/stream")
+async def query_documents_stream(
+    request: QueryRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_query_permission)
+):
+    """
+    Query documents and stream the answer as Server-Sent Events.
+    
+    Events, in order:
+        sources: {"sources": [...]} retrieved chunk metadata (trainer, title, source)
+        token:   {"text": "..."} one per piece of the answer as it is generated
+        done:    {"cached": bool}
+        error:   {"detail": "..."} if generation fails mid-stream
+    
+    Args:
+        request: QueryRequest containing the search question and optional retrieval knobs
+        db: Database session
+        
+    Returns:
+        text/event-stream response
+    """
+    try:
+        # Retrieval runs before the response starts, while the session is still open
+        prepared = await QueryService.prepare_query(
+            request.question,
+            db,
+            ef_search=request.ef_search,
+            probes=request.probes,
+            mmr_lambda=request.mmr_lambda
+        )
+    except Exception as e:
+        print(f"Unexpected error in query_documents_stream: {str(e)}")
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing query: {str(e)}"
+        )
+    
+    return StreamingResponse(
+        _stream_events(prepared),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # disable proxy buffering so tokens flush immediately
+        }
+    )
@@ -2,7 +2,7 @@
 Pydantic models for request/response validation.
 """
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 from models.user import AccessLevel
@@ -17,12 +17,21 @@ class DocumentMetadata(BaseModel):
 
 class QueryRequest(BaseModel):
     question: str
+    # Optional ANN recall knobs; server defaults are used when omitted
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000)
+    probes: Optional[int] = Field(default=None, ge=1, le=1000)
+    # Optional relevance/diversity trade-off for retrieved chunks (1 = relevance only)
+    mmr_lambda: Optional[float] = Field(default=None, ge=0, le=1)
 
 
 class ToggleActiveRequest(BaseModel):
     active: bool
 
 
+class DeleteTranscriptsRequest(BaseModel):
+    transcript_ids: list[int] = Field(min_length=1, max_length=1000)
+
+
 # Authentication schemas
 class UserRegister(BaseModel):
     first_name: str
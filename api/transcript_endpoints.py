@@ -5,26 +5,29 @@ Transcript-related API endpoints.
 import traceback
 import json
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
-from sqlalchemy.orm import Session
-from config.db_config import get_db
-from models import Transcript
-from services.chunking_service import ChunkingService
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db_config import get_async_db
+from models import Transcript, Chunk, IngestionJob
+from services.ingestion_service import IngestionService
 from services.file_processor import FileProcessor
-from api.schemas import DocumentMetadata, ToggleActiveRequest
+from services.semantic_cache import SemanticCache
+from services.cache import run_cache_call
+from api.schemas import DocumentMetadata, ToggleActiveRequest, DeleteTranscriptsRequest
 from api.auth_dependencies import (
     get_current_user, 
     require_admin_access, 
     require_query_permission
 )
-from models.user import User
+from services.session_cache import SessionUser
 
 router = APIRouter(prefix="/transcripts", tags=["transcripts"])
 
 
 @router.get("/metadata")
-def get_transcript_metadata(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+async def get_transcript_metadata(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_admin_access)
 ):
     """
     Get metadata for all transcripts.
@@ -34,7 +37,7 @@ def get_transcript_metadata(
     """
     try:
         # Query only the metadata fields, excluding transcript_text
-        transcripts = db.query(
+        result = await db.execute(select(
             Transcript.id,
             Transcript.created_at,
             Transcript.updated_at,
@@ -43,7 +46,8 @@ def get_transcript_metadata(
             Transcript.source_url,
             Transcript.title,
             Transcript.active
-        ).all()
+        ))
+        transcripts = result.all()
         
         # Convert to list of dictionaries
         metadata = []
@@ -75,14 +79,15 @@ def get_transcript_metadata(
 
 
 @router.patch("/{transcript_id}/active")
-def toggle_transcript_active(
+async def toggle_transcript_active(
     transcript_id: int, 
     request: ToggleActiveRequest, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_admin_access)
 ):
     """
     Toggle the active status of a transcript.
+    Inactive transcripts are excluded from query retrieval.
     
     Args:
         transcript_id: ID of the transcript to update
@@ -94,7 +99,7 @@ def toggle_transcript_active(
     """
     try:
         # Find the transcript
-        transcript = db.query(Transcript).filter(Transcript.id == transcript_id).first()
+        transcript = await db.get(Transcript, transcript_id)
         
         if not transcript:
             raise HTTPException(
@@ -102,10 +107,20 @@ def toggle_transcript_active(
                 detail=f"Transcript with ID {transcript_id} not found"
             )
         
-        # Update the active status
+        # Update the active status, keeping the denormalized flag on its chunks in sync
         transcript.active = request.active
-        db.commit()
-        db.refresh(transcript)
+        # Write the transcript row first: ingestion workers read the flag under a share
+        # lock on it, so their chunks either wait for this commit or get updated below
+        await db.flush()
+        await db.execute(
+            update(Chunk)
+                .where(Chunk.transcript_id == transcript_id)
+                .values(active=request.active)
+                .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        await db.refresh(transcript)
+        await run_cache_call(SemanticCache.invalidate_all)
         
         return {
             "id": transcript.id,
@@ -122,7 +137,7 @@ def toggle_transcript_active(
     except Exception as e:
         print(f"Unexpected error in toggle_transcript_active: {str(e)}")
         traceback.print_exc()
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Error updating transcript status: {str(e)}"
@@ -130,10 +145,10 @@ def toggle_transcript_active(
 
 
 @router.delete("/{transcript_id}")
-def delete_transcript(
+async def delete_transcript(
     transcript_id: int, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_admin_access)
 ):
     """
     Delete a transcript and all its associated chunks.
@@ -146,30 +161,17 @@ def delete_transcript(
         Success message with deleted transcript info
     """
     try:
-        # Find the transcript
-        transcript = db.query(Transcript).filter(Transcript.id == transcript_id).first()
+        deleted = await _delete_transcripts(db, [transcript_id])
         
-        if not transcript:
+        if not deleted:
             raise HTTPException(
                 status_code=404,
                 detail=f"Transcript with ID {transcript_id} not found"
             )
         
-        # Store transcript info before deletion for response
-        transcript_info = {
-            "id": transcript.id,
-            "title": transcript.title,
-            "trainer_name": transcript.trainer_name,
-            "media_type": transcript.media_type,
-            "created_at": transcript.created_at.isoformat() if transcript.created_at else None
-        }
-        
-        # Count chunks before deletion
-        chunk_count = len(transcript.chunks)
-        
-        # Delete the transcript (chunks will be automatically deleted due to cascade)
-        db.delete(transcript)
-        db.commit()
+        transcript_info, chunk_count = deleted[0]
+        await db.commit()
+        await run_cache_call(SemanticCache.invalidate_all)
         
         return {
             "message": f"Transcript and {chunk_count} associated chunks deleted successfully",
@@ -184,31 +186,185 @@ def delete_transcript(
     except Exception as e:
         print(f"Unexpected error in delete_transcript: {str(e)}")
         traceback.print_exc()
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Error deleting transcript: {str(e)}"
         )
 
 
-@router.post("/upload")
+@router.delete("")
+async def delete_transcripts(
+    request: DeleteTranscriptsRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_admin_access)
+):
+    """
+    Delete many transcripts and all their chunks in one statement.
+    
+    Args:
+        request: DeleteTranscriptsRequest with the IDs to delete
+        db: Database session
+        
+    Returns:
+        Deleted transcripts, total chunks deleted and the IDs that were not found
+    """
+    try:
+        deleted = await _delete_transcripts(db, request.transcript_ids)
+        await db.commit()
+        if deleted:
+            await run_cache_call(SemanticCache.invalidate_all)
+        
+        deleted_ids = {transcript_info["id"] for transcript_info, _ in deleted}
+        chunk_count = sum(count for _, count in deleted)
+        return {
+            "message": f"{len(deleted)} transcripts and {chunk_count} associated chunks deleted successfully",
+            "deleted_transcripts": [transcript_info for transcript_info, _ in deleted],
+            "chunks_deleted": chunk_count,
+            "not_found": [transcript_id for transcript_id in dict.fromkeys(request.transcript_ids) if transcript_id not in deleted_ids],
+            "status": "success"
+        }
+        
+    except Exception as e:
+        print(f"Unexpected error in delete_transcripts: {str(e)}")
+        traceback.print_exc()
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error deleting transcripts: {str(e)}"
+        )
+
+
+async def _delete_transcripts(db: AsyncSession, transcript_ids: list[int]) -> list[tuple[dict, int]]:
+    """
+    Delete transcripts in one statement without loading them or their chunks.
+
+    Chunks and ingestion jobs go with them through ON DELETE CASCADE. Chunk counts
+    come from the same statement: the count subquery sees the snapshot taken before
+    the DELETE. The caller commits.
+
+    Returns:
+        (transcript info, chunk count) for each transcript that existed
+    """
+    # Core DELETE on the table: no ORM session synchronization, nothing loaded
+    deleted = (
+        delete(Transcript.__table__)
+            .where(Transcript.id.in_(transcript_ids))
+            .returning(
+                Transcript.id,
+                Transcript.title,
+                Transcript.trainer_name,
+                Transcript.media_type,
+                Transcript.created_at
+            )
+            .cte("deleted")
+    )
+    chunk_count = (
+        select(func.count())
+            .select_from(Chunk)
+            .where(Chunk.transcript_id == deleted.c.id)
+            .scalar_subquery()
+    )
+    result = await db.execute(select(deleted, chunk_count.label("chunk_count")).order_by(deleted.c.id))
+    return [
+        (
+            {
+                "id": row.id,
+                "title": row.title,
+                "trainer_name": row.trainer_name,
+                "media_type": row.media_type,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            },
+            row.chunk_count
+        )
+        for row in result.all()
+    ]
+
+
+async def _create_transcript_and_job(db: AsyncSession, transcript_text: str, document_metadata: DocumentMetadata) -> IngestionJob:
+    """Store a transcript and queue its ingestion job in a single transaction."""
+    transcript = Transcript(
+        transcript_text=transcript_text,
+        trainer_name=document_metadata.trainerName,
+        media_type=document_metadata.mediaType,
+        source_url=document_metadata.sourceUrl,
+        title=document_metadata.title
+    )
+    db.add(transcript)
+    await db.flush()
+
+    job = IngestionService.enqueue(db, transcript.id)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+def _job_to_dict(job: IngestionJob) -> dict:
+    """Serialize an ingestion job for API responses."""
+    return {
+        "job_id": job.id,
+        "transcript_id": job.transcript_id,
+        "job_status": job.status.value,
+        "attempts": job.attempts,
+        "chunk_count": job.chunk_count,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_admin_access)
+):
+    """
+    Get the status of a transcript ingestion job.
+    
+    Args:
+        job_id: ID of the ingestion job returned by /transcripts/upload
+        db: Database session
+        
+    Returns:
+        Job status, attempt count and chunk count once finished
+    """
+    job = await db.get(IngestionJob, job_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Ingestion job with ID {job_id} not found"
+        )
+    
+    return {
+        **_job_to_dict(job),
+        "status": "success"
+    }
+
+
+@router.post("/upload", status_code=202)
 async def upload_document(
     file: UploadFile = File(...),
     metadata: str = Form(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: SessionUser = Depends(require_admin_access)
 ):
     """
-    Upload a document with metadata and store in database.
+    Upload a document with metadata and queue it for chunking and embedding.
     Supports PDF, DOC, DOCX, and TXT files.
     
+    The transcript is stored immediately; chunking and embedding run on a
+    background worker. Poll GET /transcripts/jobs/{job_id} for progress.
+    
     Args:
         file: The uploaded file (PDF, DOC, DOCX, or TXT)
         metadata: JSON string containing DocumentMetadata
         db: Database session
         
     Returns:
-        Upload confirmation with transcript details
+        Upload confirmation with transcript and ingestion job details
     """
     try:
         # Validate file type
@@ -226,25 +382,15 @@ async def upload_document(
         # Process file and extract text content
         transcript_text = await FileProcessor.process_file(file)
         
-        # Create new transcript record
-        transcript = Transcript(
-            transcript_text=transcript_text,
-            trainer_name=document_metadata.trainerName,
-            media_type=document_metadata.mediaType,
-            source_url=document_metadata.sourceUrl,
-            title=document_metadata.title
-        )
-        
-        # Add to database
-        db.add(transcript)
-        db.commit()
-        db.refresh(transcript)
-
-        ChunkingService.run_chunk_pipeline(transcript, db)
+        # Store transcript and queue ingestion
+        job = await _create_transcript_and_job(db, transcript_text, document_metadata)
+        IngestionService.notify()
         
         return {
-            "message": "File uploaded and processed successfully",
-            "transcript_id": transcript.id,
+            "message": "File uploaded and queued for processing",
+            "transcript_id": job.transcript_id,
+            "job_id": job.id,
+            "job_status": job.status.value,
             "filename": file.filename,
             "content_type": file.content_type,
             "file_size": len(transcript_text),
@@ -260,5 +406,5 @@ async def upload_document(
     except Exception as e:
         print(f"Unexpected error in upload_document: {str(e)}")
         traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,11 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from pgvector.psycopg2 import register_vector
+from pgvector.asyncpg import register_vector as register_vector_async
 
 # Load environment variables from appropriate .env file
 import os
@@ -44,11 +47,22 @@ print(f"🔍 DB_HOST: {DB_HOST}")
 print(f"🔍 DB_NAME: {DB_NAME}")
 print(f"🔍 DB_USER: {DB_USER}")
 
-# Construct database URL
+# Construct database URLs (sync psycopg2 for migrations/workers, asyncpg for request handlers)
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Create SQLAlchemy engine
+# Async connection pool size; one connection serves many in-flight requests over time
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+# Create SQLAlchemy engines
 engine = create_engine(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
 
 # Initialize pgvector extension
 def init_pgvector():
@@ -62,9 +76,36 @@ def init_pgvector():
 
 # Initialize pgvector
 init_pgvector()
+# Connections opened before the extension existed can't have the vector adapters, so start the pool fresh
+engine.dispose()
+
+# Register pgvector's adapters on every new connection so embeddings travel as NumPy arrays.
+# asyncpg uses the binary wire format (see models/vector_type.py); psycopg2 only supports
+# text parameters but still decodes vectors straight to arrays and accepts arrays in raw SQL.
+@event.listens_for(engine, "connect")
+def register_vector_psycopg2(dbapi_connection, connection_record):
+    try:
+        register_vector(dbapi_connection, globally=False)
+    except Exception as e:
+        # Before migrations have created the extension (e.g. alembic's own connection)
+        print(f"⚠️  Warning: Could not register pgvector adapters: {e}")
+    finally:
+        # End the transaction opened by the type lookup
+        dbapi_connection.rollback()
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def register_vector_asyncpg(dbapi_connection, connection_record):
+    # Required: vector parameters are bound as arrays, which only the binary codec can encode
+    dbapi_connection.run_async(register_vector_async)
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False  # attributes stay readable after commit without an implicit (sync) refresh
+)
 
 # Create declarative base
 Base = declarative_base()
@@ -76,3 +117,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
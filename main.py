@@ -2,12 +2,37 @@
 SalesMind RAG API - Main application file.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api import general_endpoints, transcript_endpoints, query_endpoints, auth_endpoints
+from services.ingestion_service import IngestionService
+from services.openai_client import OpenAIClientProvider
+from services.password_hasher import PasswordHasher
+from services.session_purge_service import SessionPurgeService
+from services.token_counter import TokenCounter
+from services.chunking_service import EMBEDDING_MODEL
+from services.query_service import COMPLETION_MODEL
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers on startup; stop them and close shared clients on shutdown."""
+    IngestionService.start()
+    SessionPurgeService.start()
+    PasswordHasher.start()
+    # Tokenizer loading reads (and may download) BPE files, so do it off the event loop before serving
+    await asyncio.to_thread(TokenCounter.warm, [COMPLETION_MODEL, EMBEDDING_MODEL])
+    yield
+    PasswordHasher.stop()
+    await SessionPurgeService.stop()
+    IngestionService.stop()
+    await OpenAIClientProvider.close()
+
 
 # FastAPI app
-app = FastAPI(title="SalesMind RAG API", version="1.0.0")
+app = FastAPI(title="SalesMind RAG API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -1,6 +1,9 @@
 from .transcript import Transcript
 from .chunk import Chunk
 from .user import User, AccessLevel
+from .ingestion_job import IngestionJob, JobStatus
+from .embedding_cache import EmbeddingCacheEntry
+from .user_session import UserSession
 from .base import Base
 
-__all__ = ["Transcript", "Chunk", "User", "AccessLevel", "Base"]
+__all__ = ["Transcript", "Chunk", "User", "AccessLevel", "IngestionJob", "JobStatus", "EmbeddingCacheEntry", "UserSession", "Base"]
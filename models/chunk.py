@@ -2,9 +2,10 @@
 Chunk model for storing text chunks and their embeddings.
 """
 
-from sqlalchemy import Column, Integer, Text, ForeignKey, Index
-from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, Integer, Text, Boolean, ForeignKey, Index, DDL, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from .vector_type import Vector
 from .base import Base
 
 class Chunk(Base):
@@ -18,13 +19,52 @@ class Chunk(Base):
     chunk_text = Column(Text, nullable=False)
     embedding = Column(Vector(1536), nullable=False)  
     
+    # Denormalized copy of Transcript.active so vector search can filter through a partial index
+    active = Column(Boolean, default=True, server_default=text("true"), nullable=False)
+    
+    # Full-text search vector kept in sync with chunk_text by a trigger (only used inside queries)
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    
     # Relationship to transcript
     transcript = relationship("Transcript", back_populates="chunks")
     
-    # Create index on transcript_id and chunk_index for efficient queries
+    # Create index on transcript_id and chunk_index for efficient queries (unique: one row per chunk position)
     __table_args__ = (
-        Index('ix_chunks_transcript_chunk', 'transcript_id', 'chunk_index'),
+        Index('ix_chunks_transcript_chunk', 'transcript_id', 'chunk_index', unique=True),
+        # Approximate nearest neighbour index for cosine similarity search over active chunks only.
+        # Databases running pgvector < 0.5.0 get an IVFFlat index instead (see migration 5e1d7b84c2a9).
+        Index(
+            'ix_chunks_embedding_hnsw_active',
+            'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_where=text('active')
+        ),
+        # Lexical (full-text) search over active chunks
+        Index(
+            'ix_chunks_search_vector_active',
+            'search_vector',
+            postgresql_using='gin',
+            postgresql_where=text('active')
+        ),
     )
     
     def __repr__(self) -> str:
         return f"<Chunk(id={self.id}, transcript_id={self.transcript_id}, chunk_index={self.chunk_index}, text_length={len(self.chunk_text) if self.chunk_text else 0})>"
+
+
+# The search_vector trigger from migration 3d8b6f1e0a57, for databases created with metadata.create_all
+event.listen(Chunk.__table__, "after_create", DDL(
+    "CREATE OR REPLACE FUNCTION chunks_search_vector_update() RETURNS trigger AS $$ "
+    "BEGIN "
+    "NEW.search_vector := to_tsvector('english'::regconfig, NEW.chunk_text); "
+    "RETURN NEW; "
+    "END "
+    "$$ LANGUAGE plpgsql"
+))
+event.listen(Chunk.__table__, "after_create", DDL(
+    "CREATE TRIGGER chunks_search_vector_update "
+    "BEFORE INSERT OR UPDATE OF chunk_text ON chunks "
+    "FOR EACH ROW EXECUTE FUNCTION chunks_search_vector_update()"
+))
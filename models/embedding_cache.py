@@ -0,0 +1,22 @@
+"""
+Embedding cache model for content-addressed reuse of embeddings.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from .vector_type import Vector
+from .base import Base
+
+
+class EmbeddingCacheEntry(Base):
+    """Embedding keyed by the sha256 of its normalized text and the model that produced it."""
+
+    __tablename__ = "embedding_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    embedding = Column(Vector(1536), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<EmbeddingCacheEntry(content_hash='{self.content_hash}', model='{self.model}')>"
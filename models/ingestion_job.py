@@ -0,0 +1,48 @@
+"""
+Ingestion job model for tracking background chunking/embedding work.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, Text, DateTime, Enum, ForeignKey, Index
+from .base import Base
+import enum
+
+
+class JobStatus(enum.Enum):
+    """Ingestion job lifecycle states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class IngestionJob(Base):
+    """Queue entry for chunking and embedding an uploaded transcript."""
+
+    __tablename__ = "ingestion_jobs"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Transcript to process (job is removed together with its transcript)
+    transcript_id = Column(Integer, ForeignKey("transcripts.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Processing state
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    chunk_count = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Workers claim the oldest queued job first
+    __table_args__ = (
+        Index('ix_ingestion_jobs_status_id', 'status', 'id'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IngestionJob(id={self.id}, transcript_id={self.transcript_id}, status='{self.status}', attempts={self.attempts})>"
@@ -1,6 +1,6 @@
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from .base import Base
 
 class Transcript(Base):
@@ -11,8 +11,8 @@ class Transcript(Base):
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
     
-    # Transcript content
-    transcript_text = Column(Text, nullable=False)
+    # Transcript content (can be hundreds of KB, so only loaded when accessed or undeferred)
+    transcript_text = deferred(Column(Text, nullable=False))
     
     # Timestamp
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -30,7 +30,8 @@ class Transcript(Base):
     active = Column(Boolean, default=True, nullable=False)  # Whether the transcript is active/visible
     
     # Relationship to chunks
-    chunks = relationship("Chunk", back_populates="transcript", cascade="all, delete-orphan")
+    # passive_deletes: the chunks.transcript_id ON DELETE CASCADE removes chunks, so the ORM never loads them to delete
+    chunks = relationship("Chunk", back_populates="transcript", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self) -> str:
         return f"<Transcript(id={self.id}, trainer_name='{self.trainer_name}', media_type='{self.media_type}', created_at='{self.created_at}')>"
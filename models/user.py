@@ -31,7 +31,6 @@ class User(Base):
     
     # Authentication
     password_hash = Column(String(255), nullable=False)  # Salted, hashed password
-    session_key = Column(String(255), nullable=True, unique=True, index=True)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
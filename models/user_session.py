@@ -0,0 +1,29 @@
+"""
+User session model for cookie-based authentication.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from .base import Base
+
+
+class UserSession(Base):
+    """A logged-in session. A user may hold several at once (one per device/browser)."""
+
+    __tablename__ = "sessions"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Session key sent in the session_key cookie
+    session_key = Column(String(255), nullable=False, unique=True, index=True)
+
+    # Owner (sessions are removed together with their user)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Timestamps (expires_at is indexed for the purge job)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<UserSession(id={self.id}, user_id={self.user_id}, expires_at='{self.expires_at}')>"
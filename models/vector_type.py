@@ -0,0 +1,31 @@
+"""
+pgvector column type that keeps embeddings as NumPy arrays end to end.
+
+pgvector's SQLAlchemy type always serializes bound values to the text form
+'[0.1,0.2,...]'. With asyncpg the vector codec registered on each connection
+(see config.db_config) sends and receives the binary form instead, so this
+type only converts values to float32 arrays and leaves encoding to the driver.
+Other drivers (psycopg2) keep the text form.
+"""
+
+import numpy as np
+from pgvector.sqlalchemy import Vector as PGVector
+
+
+class Vector(PGVector):
+    """VECTOR(dim) column bound as float32 arrays through the driver's binary codec."""
+
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        if dialect.driver != "asyncpg":
+            return super().bind_processor(dialect)
+
+        def process(value):
+            if value is None:
+                return None
+            value = np.asarray(value, dtype=np.float32)
+            if self.dim is not None and value.shape != (self.dim,):
+                raise ValueError(f"expected {self.dim} dimensions, not {value.shape[-1] if value.ndim else 0}")
+            return value
+        return process
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: memory and CPU per thousand embeddings, list vs NumPy pipeline.
+
+Compares, for synthetic 1536-dim vectors (no network or database needed):
+
+Decoding an embeddings API response
+- json_floats:    encoding_format="float", JSON floats parsed to list[float]
+- base64_tolist:  base64 decoded to float32 then .tolist() (the SDK's default)
+- base64_float32: base64 decoded straight to a float32 array (the current path)
+
+Serializing for Postgres
+- text:   pgvector text form '[0.1,...]' (psycopg2 / the stock SQLAlchemy type)
+- binary: pgvector binary form (the asyncpg codec and COPY)
+
+CPU is process time, memory is the traced size of the decoded results kept alive.
+
+Usage:
+    python scripts/benchmark_embeddings.py --count 1000 --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import tracemalloc
+
+import numpy as np
+
+# Add the parent directory to the Python path so we can import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+def measure(fn, repeat: int):
+    """Best-of-repeat CPU milliseconds, and bytes retained by one result."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        fn()
+        best = min(best, (time.process_time() - started) * 1000)
+    tracemalloc.start()
+    result = fn()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare list and NumPy embedding pipelines")
+    parser.add_argument("--count", type=int, default=1000, help="Embeddings per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    from pgvector.utils import Vector
+    from services.chunking_service import ChunkingService
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.count, EMBEDDING_DIMENSIONS)).astype(np.float32)
+    float_body = json.dumps({"data": [{"embedding": vector.tolist()} for vector in vectors]})
+    base64_body = json.dumps({"data": [{"embedding": base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")} for vector in vectors]})
+
+    decoders = [
+        ("json_floats", lambda: [item["embedding"] for item in json.loads(float_body)["data"]]),
+        ("base64_tolist", lambda: [
+            np.frombuffer(base64.b64decode(item["embedding"]), dtype="float32").tolist()
+            for item in json.loads(base64_body)["data"]
+        ]),
+        ("base64_float32", lambda: [
+            ChunkingService.decode_embedding(item["embedding"])
+            for item in json.loads(base64_body)["data"]
+        ]),
+    ]
+
+    as_lists = [vector.tolist() for vector in vectors]
+    as_arrays = list(vectors)
+    serializers = [
+        ("text", lambda: [Vector._to_db(embedding) for embedding in as_lists]),
+        ("binary", lambda: [Vector._to_db_binary(embedding) for embedding in as_arrays]),
+    ]
+
+    print(f"📊 Embedding pipeline benchmark: {args.count} x {EMBEDDING_DIMENSIONS} dims, best of {args.repeat}")
+    print(f"Response body: {len(float_body) / 1e6:.1f} MB as floats, {len(base64_body) / 1e6:.1f} MB as base64")
+    print("-" * 50)
+    print(f"{'stage':<10} {'variant':<16} {'cpu ms':>9} {'memory MB':>10}")
+    for stage, variants in (("decode", decoders), ("serialize", serializers)):
+        for name, fn in variants:
+            cpu_ms, retained = measure(fn, args.repeat)
+            print(f"{stage:<10} {name:<16} {cpu_ms:>9.1f} {retained / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: ORM vs Core hydration of retrieved chunks.
+
+Fetches k chunks (with transcript metadata) from the configured database in
+three ways and reports the median time per fetch:
+
+- orm_full:      select(Chunk) + joinedload(Chunk.transcript), whole rows
+                 (the original retrieval path, transcript_text included)
+- orm_load_only: select(Chunk) + load_only of the prompt columns
+- core_rows:     plain column select built into RetrievedChunk records
+                 (the current retrieval path)
+
+Each fetch uses a fresh session so the identity map starts empty, as it does
+per request. Needs a database with at least a few hundred chunks.
+
+Usage:
+    python scripts/benchmark_hydration.py --env local --k 10 50 200 --repeat 50
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Add the parent directory to the Python path so we can import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ORM and Core hydration of retrieved chunks")
+    parser.add_argument("--env", choices=["local", "production"], default=os.getenv("ENVIRONMENT", "local"))
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 50, 200], help="Candidate counts to fetch")
+    parser.add_argument("--repeat", type=int, default=50, help="Fetches per variant and k")
+    parser.add_argument("--with-embedding", action="store_true", help="Also fetch embeddings (as MMR does)")
+    args = parser.parse_args()
+
+    os.environ["ENVIRONMENT"] = args.env
+
+    # Import after ENVIRONMENT is set so the right config is loaded
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload, load_only
+    from config.db_config import SessionLocal
+    from models.chunk import Chunk
+    from models.transcript import Transcript
+    from services.retrieved_chunk import RetrievedChunk
+
+    def orm_full(db, k):
+        sqlstmt = (
+            select(Chunk)
+                .options(joinedload(Chunk.transcript).undefer(Transcript.transcript_text))
+                .where(Chunk.active)
+                .order_by(Chunk.id)
+                .limit(k)
+        )
+        chunks = db.execute(sqlstmt).scalars().all()
+        return [(chunk.id, chunk.chunk_text, chunk.transcript.trainer_name) for chunk in chunks]
+
+    def orm_load_only(db, k):
+        chunk_columns = [Chunk.transcript_id, Chunk.chunk_index, Chunk.chunk_text]
+        if args.with_embedding:
+            chunk_columns.append(Chunk.embedding)
+        sqlstmt = (
+            select(Chunk)
+                .options(
+                    load_only(*chunk_columns),
+                    joinedload(Chunk.transcript).load_only(
+                        Transcript.trainer_name, Transcript.title, Transcript.source_url, Transcript.media_type
+                    )
+                )
+                .where(Chunk.active)
+                .order_by(Chunk.id)
+                .limit(k)
+        )
+        chunks = db.execute(sqlstmt).scalars().all()
+        return [(chunk.id, chunk.chunk_text, chunk.transcript.trainer_name) for chunk in chunks]
+
+    def core_rows(db, k):
+        sqlstmt = (
+            select(*RetrievedChunk.columns(with_embedding=args.with_embedding))
+                .join(Transcript, Transcript.id == Chunk.transcript_id)
+                .where(Chunk.active)
+                .order_by(Chunk.id)
+                .limit(k)
+        )
+        chunks = RetrievedChunk.from_rows(db.execute(sqlstmt).all())
+        return [(chunk.id, chunk.chunk_text, chunk.trainer_name) for chunk in chunks]
+
+    variants = [("orm_full", orm_full), ("orm_load_only", orm_load_only), ("core_rows", core_rows)]
+
+    print(f"📊 Hydration benchmark ({args.env.upper()}, {args.repeat} fetches each, embeddings {'on' if args.with_embedding else 'off'})")
+    print("-" * 50)
+    print(f"{'k':>5}  {'variant':<14} {'rows':>5} {'median ms':>10} {'p95 ms':>8}")
+    for k in args.k:
+        for name, fetch in variants:
+            timings = []
+            rows = 0
+            for _ in range(args.repeat):
+                db = SessionLocal()
+                try:
+                    started = time.perf_counter()
+                    rows = len(fetch(db, k))
+                    timings.append((time.perf_counter() - started) * 1000)
+                finally:
+                    db.close()
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{k:>5}  {name:<14} {rows:>5} {statistics.median(timings):>10.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
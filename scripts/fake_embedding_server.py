@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI embeddings endpoint.
+
+Returns deterministic vectors derived from each input's text, with optional
+artificial latency and periodic 429 responses, so concurrent batching and
+rate-limit backoff can be exercised without network access or API spend.
+
+Usage:
+    python scripts/fake_embedding_server.py --port 8001 --latency 0.2 --rate-limit-every 5
+    OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=fake python scripts/run_ingestion_worker.py
+"""
+import argparse
+import base64
+import hashlib
+import itertools
+import threading
+import time
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+EMBEDDING_DIMENSIONS = 1536
+
+app = FastAPI(title="Fake OpenAI Embeddings")
+settings = {"latency": 0.0, "rate_limit_every": 0, "retry_after": 1.0}
+request_counter = itertools.count(1)
+counter_lock = threading.Lock()
+
+
+def fake_embedding(text: str) -> np.ndarray:
+    """Deterministic unit vector seeded from the text's hash."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@app.post("/v1/embeddings")
+def create_embeddings(body: dict):
+    with counter_lock:
+        request_number = next(request_counter)
+
+    if settings["rate_limit_every"] and request_number % settings["rate_limit_every"] == 0:
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": str(settings["retry_after"])},
+            content={"error": {"message": "Rate limit reached (fake)", "type": "requests", "code": "rate_limit_exceeded"}}
+        )
+
+    if settings["latency"]:
+        time.sleep(settings["latency"])
+
+    inputs = body["input"]
+    if isinstance(inputs, str):
+        inputs = [inputs]
+
+    data = []
+    for index, text in enumerate(inputs):
+        vector = fake_embedding(text)
+        if body.get("encoding_format") == "base64":
+            embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+        else:
+            embedding = vector.tolist()
+        data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+    token_count = sum(len(text.split()) for text in inputs)
+    return {
+        "object": "list",
+        "data": data,
+        "model": body.get("model", "text-embedding-3-small"),
+        "usage": {"prompt_tokens": token_count, "total_tokens": token_count}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI embeddings server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep per request")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Return 429 for every Nth request (0 disables)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429 responses")
+    args = parser.parse_args()
+
+    settings["latency"] = args.latency
+    settings["rate_limit_every"] = args.rate_limit_every
+    settings["retry_after"] = args.retry_after
+
+    print(f"🧪 Fake embeddings server at http://{args.host}:{args.port}/v1")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
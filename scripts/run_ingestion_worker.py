@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Run ingestion workers as a standalone process.
+
+Useful when API processes are started with INGESTION_WORKERS=0 so that
+chunking/embedding load is kept off the web servers entirely.
+
+Finished ingestions invalidate the semantic cache by bumping the corpus
+version. That token only reaches the API processes through a shared cache,
+so with the semantic cache enabled this script requires CACHE_BACKEND=redis.
+"""
+import os
+import sys
+import time
+import argparse
+
+# Add the parent directory to the Python path so we can import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run transcript ingestion workers")
+    parser.add_argument("--env", choices=["local", "production"], default=os.getenv("ENVIRONMENT", "local"))
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker threads (default: INGESTION_WORKERS)")
+    args = parser.parse_args()
+
+    os.environ["ENVIRONMENT"] = args.env
+
+    # Import after ENVIRONMENT is set so the right config is loaded
+    from services.ingestion_service import IngestionService, INGESTION_WORKERS
+    from services.cache import CACHE_BACKEND
+    from services.semantic_cache import SEMANTIC_CACHE_ENABLED
+
+    if SEMANTIC_CACHE_ENABLED and CACHE_BACKEND != "redis":
+        print("❌ Error: the standalone ingestion worker needs CACHE_BACKEND=redis while SEMANTIC_CACHE_ENABLED is on.")
+        print("   With the in-memory backend the API processes never see the corpus version bump and keep serving stale answers.")
+        print("   Set CACHE_BACKEND=redis for the API and the worker, or set SEMANTIC_CACHE_ENABLED=false.")
+        sys.exit(1)
+
+    num_workers = args.workers if args.workers is not None else max(INGESTION_WORKERS, 1)
+    print(f"🚀 Starting {num_workers} ingestion workers in {args.env.upper()} mode...")
+    print("-" * 50)
+
+    IngestionService.start(num_workers)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("🛑 Stopping ingestion workers...")
+        IngestionService.stop()
+
+
+if __name__ == "__main__":
+    main()
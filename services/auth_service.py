@@ -3,43 +3,59 @@ Authentication service for user management, password hashing, and session manage
 """
 
 import secrets
+import threading
+import time
 import hashlib
 import traceback
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import User, AccessLevel
-from passlib.context import CryptContext
-
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from models.user_session import UserSession
+from .metrics import Metrics
+from .password_hasher import PasswordHasher, hash_password, verify_password
+from .cache import run_cache_call
+from .session_cache import SessionCache, SessionUser
 
 # Session key length and expiration
 SESSION_KEY_LENGTH = 32
 SESSION_EXPIRATION_HOURS = 24
 
 
+# Window for the auth.login_attempts_per_minute gauge
+LOGIN_RATE_WINDOW_SECONDS = 60
+
+
 class AuthService:
     """Service for handling user authentication and authorization."""
     
+    _login_attempts: deque = deque()
+    _login_attempts_lock = threading.Lock()
+    
     @staticmethod
     def hash_password(password: str) -> str:
         """
         Hash a password using bcrypt with salt.
         
+        Blocks for the full bcrypt cost; async code should use PasswordHasher.hash.
+        
         Args:
             password: Plain text password
             
         Returns:
             Hashed password string
         """
-        return pwd_context.hash(password)
+        return hash_password(password)
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """
         Verify a password against its hash.
         
+        Blocks for the full bcrypt cost; async code should use PasswordHasher.verify.
+        
         Args:
             plain_password: Plain text password
             hashed_password: Hashed password from database
@@ -47,38 +63,39 @@ class AuthService:
         Returns:
             True if password matches, False otherwise
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        return verify_password(plain_password, hashed_password)
     
     @staticmethod
-    def generate_session_key() -> str:
+    def record_login_attempt(succeeded: bool) -> None:
         """
-        Generate a cryptographically secure random session key.
+        Count a login attempt and update the attempts-per-minute gauge.
         
-        Returns:
-            Random session key string
+        Args:
+            succeeded: Whether the credentials were valid
         """
-        return secrets.token_urlsafe(SESSION_KEY_LENGTH)
+        Metrics.increment("auth.login.succeeded" if succeeded else "auth.login.failed")
+        now = time.monotonic()
+        with AuthService._login_attempts_lock:
+            attempts = AuthService._login_attempts
+            attempts.append(now)
+            while attempts[0] < now - LOGIN_RATE_WINDOW_SECONDS:
+                attempts.popleft()
+            rate = len(attempts) * 60 / LOGIN_RATE_WINDOW_SECONDS
+        Metrics.set_gauge("auth.login_attempts_per_minute", rate)
     
     @staticmethod
-    def is_session_expired(session_created_at: datetime) -> bool:
+    def generate_session_key() -> str:
         """
-        Check if a session has expired.
+        Generate a cryptographically secure random session key.
         
-        Args:
-            session_created_at: When the session was created
-            
         Returns:
-            True if session is expired, False otherwise
+            Random session key string
         """
-        if not session_created_at:
-            return True
-        
-        expiration_time = session_created_at + timedelta(hours=SESSION_EXPIRATION_HOURS)
-        return datetime.utcnow() > expiration_time
+        return secrets.token_urlsafe(SESSION_KEY_LENGTH)
     
     @staticmethod
-    def create_user(
-        db: Session,
+    async def create_user(
+        db: AsyncSession,
         first_name: str,
         last_name: str,
         email: str,
@@ -102,15 +119,16 @@ class AuthService:
             Created User object
         """
         # Check if user already exists by email
-        existing_user = db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        existing_user = result.scalars().first()
         
         if existing_user:
             print(f"User creation failed: Email {email} already exists")
             traceback.print_exc()
             raise ValueError("User with this email already exists")
         
-        # Hash the password
-        password_hash = AuthService.hash_password(password)
+        # Hash the password (CPU-bound, so it runs on the password hashing pool)
+        password_hash = await PasswordHasher.hash(password)
         
         # Create new user
         user = User(
@@ -123,14 +141,14 @@ class AuthService:
         )
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         return user
     
     @staticmethod
-    def authenticate_user(
-        db: Session,
+    async def authenticate_user(
+        db: AsyncSession,
         email: str,
         password: str
     ) -> Optional[User]:
@@ -145,24 +163,30 @@ class AuthService:
         Returns:
             User object if authentication successful, None otherwise
         """
-        user = db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
         
         if not user:
             print(f"Authentication failed: No user found with email {email}")
             traceback.print_exc()
+            AuthService.record_login_attempt(succeeded=False)
             return None
         
-        if not AuthService.verify_password(password, user.password_hash):
+        if not await PasswordHasher.verify(password, user.password_hash):
             print(f"Authentication failed: Invalid password for email {email}")
             traceback.print_exc()
+            AuthService.record_login_attempt(succeeded=False)
             return None
         
+        AuthService.record_login_attempt(succeeded=True)
         return user
     
     @staticmethod
-    def login_user(db: Session, user: User) -> Tuple[str, datetime]:
+    async def login_user(db: AsyncSession, user: User) -> Tuple[str, datetime]:
         """
-        Log in a user and generate/update session key.
+        Log in a user by starting a new session.
+        
+        Existing sessions (e.g. on other devices) stay valid until they expire or are logged out.
         
         Args:
             db: Database session
@@ -171,76 +195,82 @@ class AuthService:
         Returns:
             Tuple of (session_key, session_expires_at)
         """
-        # Check if existing session is still valid
-        if (user.session_key and 
-            user.updated_at and 
-            not AuthService.is_session_expired(user.updated_at)):
-            # Use existing session key
-            session_key = user.session_key
-            session_expires_at = user.updated_at + timedelta(hours=SESSION_EXPIRATION_HOURS)
-        else:
-            # Generate new session key
-            session_key = AuthService.generate_session_key()
-            session_expires_at = datetime.utcnow() + timedelta(hours=SESSION_EXPIRATION_HOURS)
-        
-        # Update user with new session info
-        user.session_key = session_key
-        user.last_login = datetime.utcnow()
-        user.updated_at = datetime.utcnow()
-        
-        db.commit()
+        now = datetime.utcnow()
+        session_key = AuthService.generate_session_key()
+        session_expires_at = now + timedelta(hours=SESSION_EXPIRATION_HOURS)
+        
+        db.add(UserSession(
+            session_key=session_key,
+            user_id=user.id,
+            created_at=now,
+            expires_at=session_expires_at
+        ))
+        user.last_login = now
+        
+        await db.commit()
+        # Cached snapshots of the user's other sessions carry the previous last login
+        await run_cache_call(SessionCache.invalidate_user, user.id)
         
         return session_key, session_expires_at
     
     @staticmethod
-    def logout_user(db: Session, user: User) -> None:
+    async def logout_user(db: AsyncSession, user: SessionUser) -> None:
         """
-        Log out a user by clearing their session key.
+        End the session the user authenticated with.
         
         Args:
             db: Database session
-            user: User object to log out
+            user: Authenticated user to log out
         """
-        user.session_key = None
-        user.updated_at = datetime.utcnow()
-        db.commit()
+        await db.execute(delete(UserSession).where(UserSession.id == user.session_id))
+        await db.commit()
+        await run_cache_call(SessionCache.invalidate_user, user.id)
     
     @staticmethod
-    def get_user_by_session(db: Session, session_key: str) -> Optional[User]:
+    async def get_user_by_session(db: AsyncSession, session_key: str) -> Optional[SessionUser]:
         """
         Get user by session key and check if session is valid.
         
+        Served from the session cache when possible; the database is only
+        queried on a cache miss. Never writes: expired sessions are simply
+        rejected and later removed by SessionPurgeService.
+        
         Args:
             db: Database session
             session_key: Session key from cookie
             
         Returns:
-            User object if session is valid, None otherwise
+            Snapshot of the user if session is valid, None otherwise
         """
         if not session_key:
             return None
         
-        user = db.query(User).filter(User.session_key == session_key).first()
+        cached_user = await run_cache_call(SessionCache.get, session_key)
+        if cached_user:
+            return cached_user
         
-        if not user:
-            print(f"Session validation failed: No user found with session key {session_key}")
-            traceback.print_exc()
+        sqlstmt = (
+            select(User, UserSession.id, UserSession.expires_at)
+                .join(UserSession, UserSession.user_id == User.id)
+                .where(UserSession.session_key == session_key)
+        )
+        row = (await db.execute(sqlstmt)).first()
+        
+        if not row:
+            print("Session validation failed: No session found for session key")
             return None
         
-        # Check if session is expired
-        if AuthService.is_session_expired(user.updated_at):
+        user, session_id, session_expires_at = row
+        if datetime.utcnow() > session_expires_at:
             print(f"Session validation failed: Session expired for user {user.email}")
-            traceback.print_exc()
-            # Clear expired session
-            user.session_key = None
-            user.updated_at = datetime.utcnow()
-            db.commit()
             return None
         
-        return user
+        session_user = SessionUser.from_user(user, session_id, session_expires_at)
+        await run_cache_call(SessionCache.set, session_key, session_user)
+        return session_user
     
     @staticmethod
-    def require_access_level(user: User, required_level: AccessLevel) -> bool:
+    def require_access_level(user: SessionUser, required_level: AccessLevel) -> bool:
         """
         Check if user has required access level.
         
@@ -0,0 +1,188 @@
+"""
+Key/value caches with size bounds and expiry.
+
+CacheBackend is the interface used by the services. InMemoryCache is a
+per-process LRU with TTL and is the default (and the stand-in for tests);
+RedisCache shares entries across worker processes when CACHE_BACKEND=redis.
+Values stored in a shared backend must be JSON-serializable.
+
+RedisCache does blocking network I/O, so async code calls cache methods
+through run_cache_call, which moves them onto a worker thread for the
+Redis backend and calls them directly for the in-memory one.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .metrics import Metrics
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class CacheBackend:
+    """Interface for named caches. Hits and misses are recorded under cache.<name>.*"""
+
+    def __init__(self, name: str, ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        value = self._get(key)
+        if value is None:
+            self._misses += 1
+            Metrics.increment(f"cache.{self.name}.misses")
+        else:
+            self._hits += 1
+            Metrics.increment(f"cache.{self.name}.hits")
+        Metrics.set_gauge(f"cache.{self.name}.hit_rate", self._hits / (self._hits + self._misses))
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache (None cannot be cached)
+            ttl_seconds: Expiry override; defaults to the cache's TTL
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a value if present.
+
+        Args:
+            key: Cache key
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove every entry in this cache."""
+        raise NotImplementedError
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+
+class InMemoryCache(CacheBackend):
+    """Thread-safe LRU cache with per-entry expiry, local to this process."""
+
+    def __init__(self, name: str, max_size: int = 1000, ttl_seconds: Optional[float] = None):
+        super().__init__(name, ttl_seconds)
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        Metrics.set_gauge(f"cache.{self.name}.size", size)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by all worker processes through Redis. Size is bounded by Redis' maxmemory policy."""
+
+    def __init__(self, name: str, url: str = REDIS_URL, ttl_seconds: Optional[float] = None):
+        super().__init__(name, ttl_seconds)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("redis is required for CACHE_BACKEND=redis. Install with: pip install redis")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = f"salesmind:{name}:"
+
+    def _get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(self._prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self._client.set(self._prefix + key, json.dumps(value), px=int(ttl * 1000) if ttl is not None else None)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+
+async def run_cache_call(fn, *args, **kwargs) -> Any:
+    """
+    Call a cache method from async code without blocking the event loop.
+
+    Args:
+        fn: Cache method (or function that uses caches) to call
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Whatever fn returns
+    """
+    if CACHE_BACKEND != "redis":
+        # In-memory caches never block, so skip the thread hop
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+def create_cache(name: str, max_size: int, ttl_seconds: Optional[float] = None) -> CacheBackend:
+    """
+    Create a named cache using the configured backend.
+
+    Args:
+        name: Cache name, used for metrics and key prefixes
+        max_size: Maximum entries for the in-memory backend
+        ttl_seconds: Default expiry for entries
+
+    Returns:
+        CacheBackend instance
+    """
+    if CACHE_BACKEND == "redis":
+        return RedisCache(name, ttl_seconds=ttl_seconds)
+    return InMemoryCache(name, max_size=max_size, ttl_seconds=ttl_seconds)
@@ -0,0 +1,134 @@
+"""
+Bulk insertion of chunks for ingestion.
+
+Chunks are streamed into Postgres with COPY ... FROM STDIN in PostgreSQL's
+binary format (pgvector accepts vectors in binary COPY), which avoids the
+ORM unit of work, per-row INSERT statements and the text form of every
+1536-float vector. If COPY fails (e.g. a connection pooler that doesn't
+support it), the rows are inserted with psycopg2's execute_values in
+batches of CHUNK_INSERT_BATCH_SIZE instead. Both run in the caller's
+transaction; the caller commits.
+"""
+
+import io
+import os
+import struct
+import traceback
+
+import numpy as np
+from pgvector.utils import Vector
+from psycopg2.extras import execute_values
+from sqlalchemy.orm import Session
+
+from .metrics import Metrics
+
+CHUNK_COPY_ENABLED = os.getenv("CHUNK_COPY_ENABLED", "true").lower() == "true"
+CHUNK_INSERT_BATCH_SIZE = int(os.getenv("CHUNK_INSERT_BATCH_SIZE", "500"))
+
+# search_vector is filled in by a trigger and id comes from its sequence, so neither is written
+CHUNK_COLUMNS = "transcript_id, chunk_index, chunk_text, embedding, active"
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_HEADER = COPY_SIGNATURE + struct.pack(">ii", 0, 0)  # no flags, no header extension
+COPY_TRAILER = struct.pack(">h", -1)
+
+
+class ChunkWriter:
+    """Writes a transcript's chunks in one bulk operation."""
+
+    @staticmethod
+    def encode_copy_rows(transcript_id: int, chunk_texts: list[str], embeddings: list, active: bool) -> bytes:
+        """
+        Encode chunks as a binary COPY stream for CHUNK_COLUMNS.
+
+        Args:
+            transcript_id: ID of the transcript the chunks belong to
+            chunk_texts: Chunk texts, in chunk_index order
+            embeddings: One embedding per chunk
+            active: Value for the denormalized active flag
+
+        Returns:
+            Complete COPY payload (header, rows, trailer)
+        """
+        row_prefix = struct.pack(">h", 5) + struct.pack(">ii", 4, transcript_id)
+        active_field = struct.pack(">i?", 1, active)
+        parts = [COPY_HEADER]
+        for index, (chunk_text, embedding) in enumerate(zip(chunk_texts, embeddings)):
+            text_bytes = chunk_text.encode("utf-8")
+            vector = np.asarray(embedding, dtype=">f4")
+            parts.append(row_prefix)
+            parts.append(struct.pack(">ii", 4, index))
+            parts.append(struct.pack(">i", len(text_bytes)))
+            parts.append(text_bytes)
+            # pgvector's binary form: dimensions (uint16), unused (uint16), big-endian float32s
+            parts.append(struct.pack(">iHH", 4 + vector.nbytes, vector.shape[0], 0))
+            parts.append(vector.tobytes())
+            parts.append(active_field)
+        parts.append(COPY_TRAILER)
+        return b"".join(parts)
+
+    @staticmethod
+    def copy_chunks(cursor, transcript_id: int, chunk_texts: list[str], embeddings: list, active: bool) -> None:
+        """Stream the chunks in with binary COPY."""
+        payload = ChunkWriter.encode_copy_rows(transcript_id, chunk_texts, embeddings, active)
+        cursor.copy_expert(f"COPY chunks ({CHUNK_COLUMNS}) FROM STDIN WITH (FORMAT binary)", io.BytesIO(payload))
+
+    @staticmethod
+    def insert_values(cursor, transcript_id: int, chunk_texts: list[str], embeddings: list, active: bool,
+                      batch_size: int = CHUNK_INSERT_BATCH_SIZE) -> None:
+        """Insert the chunks with multi-row INSERTs of batch_size rows."""
+        rows = [
+            (transcript_id, index, chunk_text, Vector(embedding).to_text(), active)
+            for index, (chunk_text, embedding) in enumerate(zip(chunk_texts, embeddings))
+        ]
+        execute_values(
+            cursor,
+            f"INSERT INTO chunks ({CHUNK_COLUMNS}) VALUES %s",
+            rows,
+            template="(%s, %s, %s, %s::vector, %s)",
+            page_size=batch_size
+        )
+
+    @staticmethod
+    def write(db: Session, transcript_id: int, chunk_texts: list[str], embeddings: list, active: bool = True) -> int:
+        """
+        Insert a transcript's chunks in the session's transaction.
+
+        Args:
+            db: Database session (psycopg2); the caller commits
+            transcript_id: ID of the transcript the chunks belong to
+            chunk_texts: Chunk texts, in chunk_index order
+            embeddings: One embedding per chunk
+            active: Whether the transcript is active
+
+        Returns:
+            Number of chunks written
+        """
+        if len(chunk_texts) != len(embeddings):
+            raise ValueError(f"Expected {len(chunk_texts)} embeddings, got {len(embeddings)}")
+        if not chunk_texts:
+            return 0
+
+        # Raw cursor on the session's own connection, so the rows share its transaction
+        cursor = db.connection().connection.cursor()
+        try:
+            if CHUNK_COPY_ENABLED:
+                try:
+                    # Savepoint so a failed COPY leaves the transaction usable for the fallback
+                    with db.begin_nested():
+                        with Metrics.timer("chunk_writer.copy_seconds"):
+                            ChunkWriter.copy_chunks(cursor, transcript_id, chunk_texts, embeddings, active)
+                    Metrics.increment("chunk_writer.copied_rows", len(chunk_texts))
+                    return len(chunk_texts)
+                except Exception as e:
+                    print(f"⚠️  Warning: COPY of {len(chunk_texts)} chunks failed, falling back to batched INSERTs: {e}")
+                    traceback.print_exc()
+                    Metrics.increment("chunk_writer.copy_fallbacks")
+
+            with Metrics.timer("chunk_writer.insert_seconds"):
+                ChunkWriter.insert_values(cursor, transcript_id, chunk_texts, embeddings, active)
+            Metrics.increment("chunk_writer.inserted_rows", len(chunk_texts))
+            return len(chunk_texts)
+        finally:
+            cursor.close()
+
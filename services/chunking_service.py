@@ -1,27 +1,47 @@
-import traceback
+import base64
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+import numpy as np
 import openai 
 from sqlalchemy.orm import Session
 import os
 
-from models.chunk import Chunk
 from models.transcript import Transcript
+from .metrics import Metrics
+from .token_counter import TokenCounter
+from .embedding_cache_service import EmbeddingCacheService
+from .openai_client import OpenAIClientProvider
 
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+# Per-request limits for the embeddings API: total tokens and number of inputs
 MAX_BATCH_TOKENS = int(os.getenv("MAX_BATCH_SIZE", "7000"))
+MAX_BATCH_INPUTS = int(os.getenv("MAX_BATCH_INPUTS", "2048"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
 
+EMBEDDING_MODEL = "text-embedding-3-small"
 
+# Concurrent batching: number of embedding requests in flight per ingestion job
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+
+# Backoff for rate limits and transient API errors
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
+EMBEDDING_BACKOFF_SECONDS = float(os.getenv("EMBEDDING_BACKOFF_SECONDS", "1.0"))
+EMBEDDING_BACKOFF_MAX_SECONDS = float(os.getenv("EMBEDDING_BACKOFF_MAX_SECONDS", "30.0"))
+
+RETRYABLE_EMBEDDING_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
 
-class ChunkingService:
-    @staticmethod 
-    def run_chunk_pipeline(transcript, db : Session):
-        chunk_texts = ChunkingService.chunk_text(transcript.transcript_text)
-        embeddings = ChunkingService.batch_embeddings(chunk_texts)
-        chunks = ChunkingService.create_chunks(chunk_texts, embeddings, transcript.id)
-        db.add_all(chunks)
-        db.commit()
 
+
+class ChunkingService:
     @staticmethod
     def chunk_text(text : str) -> list[str]:
         splitter = RecursiveCharacterTextSplitter(
@@ -34,40 +54,198 @@ class ChunkingService:
 
     
     @staticmethod
-    def get_embeddings(chunk_texts : list[str]) -> list[list[float]]:
-        try: 
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            response = client.embeddings.create(
-                input=chunk_texts,
-                model="text-embedding-3-small"
-            )
-            embeddings = [data.embedding for data in response.data]
-        except Exception as e:
-            print(e)
-            traceback.print_exc()
-            return []
-        return embeddings
+    def decode_embedding(value) -> np.ndarray:
+        """
+        Turn an embedding into a float32 array.
+
+        Args:
+            value: Base64 string of little-endian float32s (as the API returns with
+                encoding_format="base64"), or a sequence of floats
+
+        Returns:
+            1-D float32 array
+        """
+        if isinstance(value, str):
+            # frombuffer is a view of the decoded bytes: no per-float Python objects
+            return np.frombuffer(base64.b64decode(value), dtype="<f4")
+        return np.asarray(value, dtype=np.float32)
+
+    @staticmethod
+    def encode_embedding(embedding) -> str:
+        """Serialize an embedding as base64 float32s (the inverse of decode_embedding)."""
+        return base64.b64encode(np.asarray(embedding, dtype="<f4").tobytes()).decode("ascii")
+
+    @staticmethod
+    def request_embeddings(chunk_texts : list[str], client : openai.OpenAI = None) -> list[np.ndarray]:
+        """Call the embeddings API once, raising on failure."""
+        if client is None:
+            client = OpenAIClientProvider.get_client()
+        # Explicit base64 skips the SDK's conversion of every vector to a list of Python floats
+        response = client.embeddings.create(
+            input=chunk_texts,
+            model=EMBEDDING_MODEL,
+            encoding_format="base64"
+        )
+        return [ChunkingService.decode_embedding(data.embedding) for data in response.data]
+
+    @staticmethod
+    async def request_embeddings_async(chunk_texts : list[str]) -> list[np.ndarray]:
+        """Call the embeddings API once without blocking the event loop, raising on failure."""
+        client = OpenAIClientProvider.get_async_client()
+        response = await client.embeddings.create(
+            input=chunk_texts,
+            model=EMBEDDING_MODEL,
+            encoding_format="base64"
+        )
+        return [ChunkingService.decode_embedding(data.embedding) for data in response.data]
+
+    # Shared across batch threads: when one request is rate limited, all of them pause
+    _rate_limit_lock = threading.Lock()
+    _rate_limited_until : float = 0.0
 
     @staticmethod
-    def batch_embeddings(chunk_texts : list[str]) -> list[list[float]]:
-        batch_size : int = MAX_BATCH_TOKENS // CHUNK_SIZE;
-        num_chunks : int = len(chunk_texts)
-        embeddings : list[list[float]] = []
-        for i in range(0, num_chunks, batch_size):
-            upperIndex = i + batch_size if i + batch_size < num_chunks else num_chunks
-            batch_texts = chunk_texts[i:upperIndex]
-            batch_embeddings = ChunkingService.get_embeddings(batch_texts)
+    def _retry_delay(error : Exception, attempt : int) -> float:
+        """Seconds to wait before retrying, honouring Retry-After when the API sends it."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), EMBEDDING_BACKOFF_MAX_SECONDS)
+            except ValueError:
+                pass
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(EMBEDDING_BACKOFF_SECONDS * (2 ** attempt), EMBEDDING_BACKOFF_MAX_SECONDS))
+
+    @staticmethod
+    def embed_batch_with_retry(chunk_texts : list[str]) -> list[np.ndarray]:
+        """
+        Embed one batch, retrying rate limits and transient errors with backoff.
+
+        Raises the last error once EMBEDDING_MAX_RETRIES is exhausted, so a failed
+        batch can never silently shift embeddings onto the wrong chunks.
+        """
+        # Retries are handled here, so disable the client's own retry loop
+        client = OpenAIClientProvider.get_client(max_retries=0)
+        attempt = 0
+        while True:
+            wait = ChunkingService._rate_limited_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                embeddings = ChunkingService.request_embeddings(chunk_texts, client)
+                if len(embeddings) != len(chunk_texts):
+                    raise ValueError(f"Expected {len(chunk_texts)} embeddings, got {len(embeddings)}")
+                return embeddings
+            except RETRYABLE_EMBEDDING_ERRORS as e:
+                if attempt >= EMBEDDING_MAX_RETRIES:
+                    raise
+                delay = ChunkingService._retry_delay(e, attempt)
+                if isinstance(e, openai.RateLimitError):
+                    with ChunkingService._rate_limit_lock:
+                        ChunkingService._rate_limited_until = max(
+                            ChunkingService._rate_limited_until,
+                            time.monotonic() + delay
+                        )
+                print(f"Embedding batch failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    @staticmethod
+    def pack_batches(chunk_texts : list[str], max_tokens : int = MAX_BATCH_TOKENS, max_inputs : int = MAX_BATCH_INPUTS) -> list[list[str]]:
+        """
+        Greedily pack consecutive chunks into batches bounded by tokenizer-counted
+        tokens and input count. Order is preserved so batch results can simply be
+        concatenated. A chunk larger than max_tokens gets a batch of its own.
+        """
+        token_counts = TokenCounter.count_many(chunk_texts, EMBEDDING_MODEL)
+        batches : list[list[str]] = []
+        current : list[str] = []
+        current_tokens = 0
+        for chunk_text, token_count in zip(chunk_texts, token_counts):
+            if current and (current_tokens + token_count > max_tokens or len(current) >= max_inputs):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(chunk_text)
+            current_tokens += token_count
+        if current:
+            batches.append(current)
+
+        if batches:
+            total_tokens = sum(token_counts)
+            fill_ratio = total_tokens / (len(batches) * max_tokens)
+            Metrics.increment("embedding.batches", len(batches))
+            Metrics.increment("embedding.tokens", total_tokens)
+            Metrics.observe("embedding.batch_fill_ratio", fill_ratio)
+            print(f"Packed {len(chunk_texts)} chunks ({total_tokens} tokens) into {len(batches)} embedding batches, {fill_ratio:.0%} of token budget used")
+        return batches
+
+    @staticmethod
+    def embed_texts(chunk_texts : list[str], concurrency : int = EMBEDDING_CONCURRENCY,
+                    on_batch : Optional[Callable[[list[str], list[np.ndarray]], None]] = None) -> list[np.ndarray]:
+        """
+        Embed texts in order, sending up to `concurrency` batches at a time.
+        on_batch, if given, is called with each batch's texts and embeddings as soon as it returns.
+        """
+        batches : list[list[str]] = ChunkingService.pack_batches(chunk_texts)
+
+        def embed_batch(batch : list[str]) -> list[np.ndarray]:
+            batch_embeddings = ChunkingService.embed_batch_with_retry(batch)
+            if on_batch is not None:
+                on_batch(batch, batch_embeddings)
+            return batch_embeddings
+
+        if concurrency <= 1 or len(batches) <= 1:
+            results = [embed_batch(batch) for batch in batches]
+        else:
+            # executor.map yields results in submission order, so chunk order is preserved
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(batches)), thread_name_prefix="embedding") as executor:
+                results = list(executor.map(embed_batch, batches))
+
+        embeddings : list[np.ndarray] = []
+        for batch_embeddings in results:
             embeddings.extend(batch_embeddings)
         return embeddings
 
     @staticmethod
-    def create_chunks(chunk_texts : list[str], embeddings : list[list[float]], transcript_id : int) -> list[Chunk]:
-        chunks : list[Chunk] = []
-        for index, chunk_text in enumerate(chunk_texts):
-            chunks.append(Chunk(
-                chunk_text=chunk_text,
-                embedding=embeddings[index],
-                transcript_id=transcript_id,
-                chunk_index=index
-            ))
-        return chunks
\ No newline at end of file
+    def batch_embeddings(chunk_texts : list[str], concurrency : int = EMBEDDING_CONCURRENCY, db : Session = None) -> list[np.ndarray]:
+        """
+        Embed chunk texts in order, as float32 arrays. When a session is given, the
+        persistent embedding cache is consulted first and only unseen texts are sent
+        to the API. Cache reads and writes use their own short transactions on the
+        session's engine, and each batch's new embeddings are committed as soon as it
+        returns, so they are kept even if the caller's transaction is rolled back.
+        """
+        if db is None:
+            return ChunkingService.embed_texts(chunk_texts, concurrency)
+
+        content_hashes = [EmbeddingCacheService.content_hash(chunk_text) for chunk_text in chunk_texts]
+        lookup_db = Session(bind=db.get_bind())
+        try:
+            cached = EmbeddingCacheService.lookup(lookup_db, content_hashes, EMBEDDING_MODEL)
+        finally:
+            lookup_db.close()
+
+        # Embed each unseen text once, even if it repeats within the transcript
+        missing : dict[str, str] = {}
+        for content_hash, chunk_text in zip(content_hashes, chunk_texts):
+            if content_hash not in cached and content_hash not in missing:
+                missing[content_hash] = chunk_text
+
+        if missing:
+            hash_by_text = {chunk_text: content_hash for content_hash, chunk_text in missing.items()}
+
+            def store_batch(batch : list[str], batch_embeddings : list[np.ndarray]) -> None:
+                EmbeddingCacheService.store_committed(
+                    db,
+                    {hash_by_text[chunk_text]: embedding for chunk_text, embedding in zip(batch, batch_embeddings)},
+                    EMBEDDING_MODEL
+                )
+
+            new_embeddings = ChunkingService.embed_texts(list(missing.values()), concurrency, on_batch=store_batch)
+            cached.update(zip(missing.keys(), new_embeddings))
+
+        hits = sum(1 for content_hash in content_hashes if content_hash not in missing)
+        EmbeddingCacheService.record(hits, len(chunk_texts) - hits)
+        print(f"Embedding cache: {hits}/{len(chunk_texts)} chunks served from cache, {len(missing)} texts embedded")
+        return [cached[content_hash] for content_hash in content_hashes]
@@ -0,0 +1,169 @@
+"""
+Context assembly for the answer prompt.
+
+Retrieval often returns neighbouring chunks of the same transcript, and
+consecutive chunks share up to CHUNK_OVERLAP characters. The assembler groups
+retrieved chunks by transcript, merges runs of consecutive chunk_index values
+into a single passage with the duplicated overlap removed, and orders the
+passages by the best retrieval rank they contain. Optionally, gaps of up to
+CONTEXT_BRIDGE_GAP missing chunks between two retrieved chunks are filled in
+from the database (an index lookup on transcript_id, chunk_index) so the
+passage reads continuously.
+"""
+
+import os
+from typing import Optional
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.chunk import Chunk
+from .chunking_service import CHUNK_OVERLAP
+from .retrieved_chunk import RetrievedChunk
+
+# Fill gaps of up to this many unretrieved chunks between retrieved neighbours (0 disables)
+CONTEXT_BRIDGE_GAP = int(os.getenv("CONTEXT_BRIDGE_GAP", "0"))
+
+# Shorter suffix/prefix matches are treated as coincidence rather than chunk overlap
+MIN_OVERLAP_CHARS = 20
+
+
+class ContextPassage:
+    """A contiguous span of one transcript, built from one or more chunks."""
+
+    def __init__(self, transcript_id: int, trainer_name: Optional[str], chunk_ids: list[int],
+                 start_index: int, end_index: int, text: str, rank: int):
+        self.transcript_id = transcript_id
+        self.trainer_name = trainer_name
+        self.chunk_ids = chunk_ids
+        self.start_index = start_index
+        self.end_index = end_index
+        self.text = text
+        self.rank = rank
+
+    def __repr__(self) -> str:
+        return f"<ContextPassage(transcript_id={self.transcript_id}, chunks={self.start_index}-{self.end_index}, rank={self.rank}, text_length={len(self.text)})>"
+
+
+class ContextAssembler:
+    """Turns retrieved chunks into de-duplicated, relevance-ordered passages."""
+
+    @staticmethod
+    def overlap_length(previous_text: str, next_text: str, max_overlap: int = CHUNK_OVERLAP) -> int:
+        """
+        Find how much of the start of next_text repeats the end of previous_text.
+
+        Args:
+            previous_text: Text of the earlier chunk
+            next_text: Text of the following chunk
+            max_overlap: Longest overlap to look for
+
+        Returns:
+            Length of the shared text, or 0 if there is none
+        """
+        longest = min(len(previous_text), len(next_text), max_overlap)
+        for length in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+            if previous_text.endswith(next_text[:length]):
+                return length
+        return 0
+
+    @staticmethod
+    def merge_texts(texts: list[str]) -> str:
+        """
+        Join the texts of consecutive chunks, keeping shared overlap only once.
+
+        Args:
+            texts: Chunk texts in chunk_index order
+
+        Returns:
+            Merged text
+        """
+        parts = [texts[0]]
+        for previous_text, next_text in zip(texts, texts[1:]):
+            overlap = ContextAssembler.overlap_length(previous_text, next_text)
+            parts.append(next_text[overlap:] if overlap else "\n" + next_text)
+        return "".join(parts)
+
+    @staticmethod
+    async def get_bridge_chunks(chunks: list[RetrievedChunk], db: AsyncSession, max_gap: int) -> list[RetrievedChunk]:
+        """
+        Load the unretrieved chunks lying in small gaps between retrieved chunks of a transcript.
+
+        Args:
+            chunks: Retrieved chunks
+            db: Database session
+            max_gap: Largest number of missing chunks to fill between two retrieved ones
+
+        Returns:
+            The gap chunks (text and position only, no transcript metadata)
+        """
+        indexes_by_transcript: dict[int, list[int]] = {}
+        for chunk in chunks:
+            indexes_by_transcript.setdefault(chunk.transcript_id, []).append(chunk.chunk_index)
+
+        wanted = []
+        for transcript_id, indexes in indexes_by_transcript.items():
+            indexes.sort()
+            for previous_index, next_index in zip(indexes, indexes[1:]):
+                if 1 < next_index - previous_index <= max_gap + 1:
+                    wanted.extend((transcript_id, index) for index in range(previous_index + 1, next_index))
+        if not wanted:
+            return []
+
+        sqlstmt = (
+            select(Chunk.id, Chunk.transcript_id, Chunk.chunk_index, Chunk.chunk_text)
+                .where(tuple_(Chunk.transcript_id, Chunk.chunk_index).in_(wanted))
+        )
+        result = await db.execute(sqlstmt)
+        return RetrievedChunk.from_rows(result.all())
+
+    @staticmethod
+    async def assemble(chunks: list[RetrievedChunk], db: Optional[AsyncSession] = None,
+                       bridge_gap: int = CONTEXT_BRIDGE_GAP) -> list[ContextPassage]:
+        """
+        Build prompt passages from retrieved chunks.
+
+        Args:
+            chunks: Retrieved chunks, most relevant first
+            db: Database session, needed only when bridge_gap > 0
+            bridge_gap: Largest gap of unretrieved chunks to fill in
+
+        Returns:
+            Passages ordered by the best retrieval rank they contain
+        """
+        # Rank of each chunk in the retrieval results; bridge chunks inherit their run's rank
+        ranks = {chunk.id: rank for rank, chunk in enumerate(chunks)}
+        all_chunks = list(chunks)
+        if bridge_gap > 0 and db is not None:
+            all_chunks.extend(await ContextAssembler.get_bridge_chunks(chunks, db, bridge_gap))
+
+        trainer_names = {chunk.transcript_id: chunk.trainer_name for chunk in chunks}
+        by_transcript: dict[int, list[RetrievedChunk]] = {}
+        for chunk in all_chunks:
+            by_transcript.setdefault(chunk.transcript_id, []).append(chunk)
+
+        passages = []
+        for transcript_id, transcript_chunks in by_transcript.items():
+            transcript_chunks.sort(key=lambda chunk: chunk.chunk_index)
+            run = [transcript_chunks[0]]
+            for chunk in transcript_chunks[1:]:
+                if chunk.chunk_index == run[-1].chunk_index + 1:
+                    run.append(chunk)
+                    continue
+                passages.append(ContextAssembler._make_passage(transcript_id, trainer_names[transcript_id], run, ranks))
+                run = [chunk]
+            passages.append(ContextAssembler._make_passage(transcript_id, trainer_names[transcript_id], run, ranks))
+
+        passages.sort(key=lambda passage: passage.rank)
+        return passages
+
+    @staticmethod
+    def _make_passage(transcript_id: int, trainer_name: Optional[str], run: list[RetrievedChunk], ranks: dict) -> ContextPassage:
+        return ContextPassage(
+            transcript_id=transcript_id,
+            trainer_name=trainer_name,
+            chunk_ids=[chunk.id for chunk in run],
+            start_index=run[0].chunk_index,
+            end_index=run[-1].chunk_index,
+            text=ContextAssembler.merge_texts([chunk.chunk_text for chunk in run]),
+            rank=min(ranks[chunk.id] for chunk in run if chunk.id in ranks)
+        )
@@ -0,0 +1,76 @@
+"""
+Token-budgeted context for the answer prompt.
+
+Passages are added in relevance order while they fit in CONTEXT_TOKEN_BUDGET
+tokens, counted with the completion model's tokenizer. Passages that would
+overflow the budget are skipped and later (shorter) ones are still tried, so
+one very long passage cannot push the prompt size, and with it completion
+latency, past the budget.
+"""
+
+import os
+
+from .context_assembler import ContextPassage
+from .token_counter import TokenCounter
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+
+PASSAGE_SEPARATOR = "--------------------------------\n"
+
+
+class ContextBuilder:
+    """Formats passages into the context section of the prompt within a token budget."""
+
+    @staticmethod
+    def format_passage(index: int, passage: ContextPassage) -> str:
+        """
+        Format one passage as it appears in the prompt.
+
+        Args:
+            index: Position of the passage in the context
+            passage: Passage to format
+
+        Returns:
+            Formatted passage, ending with the separator line
+        """
+        lines = [f"Chunk {index}:"]
+        if passage.trainer_name:
+            lines.append(f"Trainer: {passage.trainer_name}")
+        if passage.text:
+            lines.append(f"Chunk: {passage.text}")
+        return "\n".join(lines) + "\n" + PASSAGE_SEPARATOR
+
+    @staticmethod
+    def build(passages: list[ContextPassage], model: str, token_budget: int = CONTEXT_TOKEN_BUDGET) -> tuple[str, dict]:
+        """
+        Build the context section from as many passages as fit in the budget.
+
+        Args:
+            passages: Passages, most relevant first
+            model: Completion model whose tokenizer counts the budget
+            token_budget: Maximum tokens for the context section
+
+        Returns:
+            Tuple of (context text, stats) where stats has tokens, token_budget,
+            passages_used and passages_skipped
+        """
+        parts = [PASSAGE_SEPARATOR]
+        used_tokens = TokenCounter.count(PASSAGE_SEPARATOR, model)
+        skipped = 0
+        for passage in passages:
+            # Number by position in the prompt, not by retrieval rank, so skipped passages leave no holes
+            formatted = ContextBuilder.format_passage(len(parts) - 1, passage)
+            tokens = TokenCounter.count(formatted, model)
+            if used_tokens + tokens > token_budget:
+                skipped += 1
+                continue
+            parts.append(formatted)
+            used_tokens += tokens
+
+        stats = {
+            "tokens": used_tokens,
+            "token_budget": token_budget,
+            "passages_used": len(parts) - 1,
+            "passages_skipped": skipped
+        }
+        return "".join(parts), stats
@@ -0,0 +1,144 @@
+"""
+Persistent, content-addressed embedding cache.
+
+Embeddings are stored under sha256(normalized text) + model name, so any
+chunk text that has been embedded before (re-uploads, duplicate videos,
+corrected transcripts) is served from Postgres instead of the OpenAI API.
+"""
+
+import hashlib
+import traceback
+import unicodedata
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.embedding_cache import EmbeddingCacheEntry
+from .metrics import Metrics
+
+# Keep IN (...) lists and multi-row INSERTs to a reasonable size
+LOOKUP_BATCH_SIZE = 1000
+STORE_BATCH_SIZE = 500
+
+
+class EmbeddingCacheService:
+    """Service for looking up and storing cached embeddings."""
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normalize text before hashing so trivially different copies share an entry.
+
+        Applies Unicode NFC normalization and collapses all whitespace runs to a single space.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Normalized text
+        """
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """
+        Get the cache key for a text.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Hex sha256 digest of the normalized text
+        """
+        normalized = EmbeddingCacheService.normalize_text(text)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def lookup(db: Session, content_hashes: list[str], model: str) -> dict:
+        """
+        Fetch cached embeddings.
+
+        Args:
+            db: Database session
+            content_hashes: Cache keys to look up
+            model: Embedding model name
+
+        Returns:
+            Dictionary of content hash to embedding for the keys that were found
+        """
+        unique_hashes = list(dict.fromkeys(content_hashes))
+        found = {}
+        for i in range(0, len(unique_hashes), LOOKUP_BATCH_SIZE):
+            rows = (
+                db.query(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding)
+                    .filter(
+                        EmbeddingCacheEntry.model == model,
+                        EmbeddingCacheEntry.content_hash.in_(unique_hashes[i:i + LOOKUP_BATCH_SIZE])
+                    )
+                    .all()
+            )
+            for row in rows:
+                found[row.content_hash] = row.embedding
+        return found
+
+    @staticmethod
+    def store(db: Session, embeddings_by_hash: dict, model: str) -> None:
+        """
+        Add embeddings to the cache, ignoring keys that already exist.
+
+        Runs in the caller's transaction; the caller commits.
+
+        Args:
+            db: Database session
+            embeddings_by_hash: Dictionary of content hash to embedding
+            model: Embedding model name
+        """
+        now = datetime.utcnow()
+        rows = [
+            {"content_hash": content_hash, "model": model, "embedding": embedding, "created_at": now}
+            for content_hash, embedding in embeddings_by_hash.items()
+        ]
+        for i in range(0, len(rows), STORE_BATCH_SIZE):
+            stmt = (
+                insert(EmbeddingCacheEntry)
+                    .values(rows[i:i + STORE_BATCH_SIZE])
+                    .on_conflict_do_nothing(index_elements=["content_hash", "model"])
+            )
+            db.execute(stmt)
+
+    @staticmethod
+    def store_committed(db: Session, embeddings_by_hash: dict, model: str) -> None:
+        """
+        Add embeddings to the cache in their own transaction, committed immediately.
+
+        Entries paid for by an ingestion job survive even if the job later fails,
+        so retries don't embed the same texts again. A failed write is logged
+        and ignored: the cache is an optimization, not part of the job.
+
+        Args:
+            db: Session whose engine is used; its own transaction is not touched
+            embeddings_by_hash: Dictionary of content hash to embedding
+            model: Embedding model name
+        """
+        cache_db = Session(bind=db.get_bind())
+        try:
+            EmbeddingCacheService.store(cache_db, embeddings_by_hash, model)
+            cache_db.commit()
+        except Exception as e:
+            print(f"⚠️  Warning: Could not store {len(embeddings_by_hash)} embeddings in the cache: {e}")
+            traceback.print_exc()
+            cache_db.rollback()
+        finally:
+            cache_db.close()
+
+    @staticmethod
+    def record(hits: int, misses: int) -> None:
+        """
+        Record cache hit/miss counts.
+
+        Args:
+            hits: Number of texts served from the cache
+            misses: Number of texts that had to be embedded
+        """
+        Metrics.increment("embedding_cache.hits", hits)
+        Metrics.increment("embedding_cache.misses", misses)
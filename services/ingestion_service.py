@@ -0,0 +1,316 @@
+"""
+Background ingestion service.
+
+Uploads enqueue an IngestionJob row; a pool of worker threads claims queued jobs
+with SELECT ... FOR UPDATE SKIP LOCKED and runs the chunking/embedding pipeline
+off the request path. Because the queue lives in the database, several API
+processes (or a standalone worker, see scripts/run_ingestion_worker.py) can
+share it safely.
+"""
+
+import os
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config.db_config import SessionLocal
+from models.chunk import Chunk
+from models.ingestion_job import IngestionJob, JobStatus
+from models.transcript import Transcript
+from .chunking_service import ChunkingService
+from .chunk_writer import ChunkWriter
+from .semantic_cache import SemanticCache
+
+# Worker pool configuration
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_POLL_SECONDS = float(os.getenv("INGESTION_POLL_SECONDS", "5"))
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+
+# Jobs stuck in RUNNING longer than this are assumed orphaned by a crashed worker
+INGESTION_STALE_MINUTES = int(os.getenv("INGESTION_STALE_MINUTES", "30"))
+
+
+class IngestionService:
+    """Service for queueing and processing transcript ingestion jobs."""
+
+    _workers: list[threading.Thread] = []
+    _wakeup = threading.Event()
+    _stopping = threading.Event()
+
+    @staticmethod
+    def enqueue(db: AsyncSession, transcript_id: int) -> IngestionJob:
+        """
+        Add an ingestion job for a transcript to the session.
+
+        The caller commits, so the transcript and its job are created atomically.
+        Call notify() after the commit to wake an idle worker.
+
+        Args:
+            db: Database session
+            transcript_id: ID of the transcript to chunk and embed
+
+        Returns:
+            The pending IngestionJob
+        """
+        job = IngestionJob(transcript_id=transcript_id, status=JobStatus.QUEUED)
+        db.add(job)
+        return job
+
+    @staticmethod
+    def notify() -> None:
+        """Wake idle workers in this process so a new job starts without waiting for the next poll."""
+        IngestionService._wakeup.set()
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[IngestionJob]:
+        """
+        Get an ingestion job by ID.
+
+        Args:
+            db: Database session
+            job_id: Job ID
+
+        Returns:
+            IngestionJob if found, None otherwise
+        """
+        return db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+
+    @staticmethod
+    def claim_next_job(db: Session) -> Optional[int]:
+        """
+        Atomically move the oldest queued job to RUNNING.
+
+        SKIP LOCKED lets concurrent workers claim different jobs without blocking each other.
+
+        Args:
+            db: Database session
+
+        Returns:
+            ID of the claimed job, or None if the queue is empty
+        """
+        next_job = (
+            select(IngestionJob.id)
+                .where(IngestionJob.status == JobStatus.QUEUED)
+                .order_by(IngestionJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+        )
+        now = datetime.utcnow()
+        stmt = (
+            update(IngestionJob)
+                .where(IngestionJob.id == next_job)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=IngestionJob.attempts + 1,
+                    started_at=now,
+                    updated_at=now
+                )
+                .returning(IngestionJob.id)
+                .execution_options(synchronize_session=False)
+        )
+        job_id = db.execute(stmt).scalar()
+        db.commit()
+        return job_id
+
+    @staticmethod
+    def lock_claim(db: Session, job_id: int, attempt: int) -> Optional[IngestionJob]:
+        """
+        Lock a job if it is still RUNNING under the given attempt (compare-and-set).
+
+        A job that requeue_stale_jobs returned to the queue, or that another worker
+        claimed again, no longer matches, so a worker still finishing an earlier
+        attempt discards its results instead of writing a second set of chunks.
+
+        Args:
+            db: Database session
+            job_id: Job ID
+            attempt: Value of attempts when the job was claimed
+
+        Returns:
+            The locked IngestionJob, or None if the claim was lost
+        """
+        return (
+            db.query(IngestionJob)
+                .filter(
+                    IngestionJob.id == job_id,
+                    IngestionJob.status == JobStatus.RUNNING,
+                    IngestionJob.attempts == attempt
+                )
+                .with_for_update()
+                .first()
+        )
+
+    @staticmethod
+    def run_job(job_id: int) -> None:
+        """
+        Chunk and embed the transcript for a claimed job.
+
+        No transaction is open while embeddings are requested: the transcript text
+        is read in a short transaction that is committed straight away, and the
+        chunks and the SUCCEEDED status are written in one short transaction at
+        the end. That write only happens while this worker still owns the job; it
+        replaces any chunks left by an earlier attempt, and reads the transcript's
+        active flag under a share lock so a concurrent activation toggle is never
+        lost. Failed jobs are re-queued until INGESTION_MAX_ATTEMPTS is reached.
+
+        Args:
+            job_id: ID of a job in RUNNING state
+        """
+        db = SessionLocal()
+        attempt = None
+        try:
+            job = IngestionService.get_job(db, job_id)
+            if not job:
+                # Transcript (and its job) was deleted while queued
+                return
+            transcript_id = job.transcript_id
+            attempt = job.attempts
+            transcript_text = db.query(Transcript.transcript_text).filter(Transcript.id == transcript_id).scalar()
+            # End the read transaction: the embedding calls below can take minutes
+            db.commit()
+
+            chunk_texts = ChunkingService.chunk_text(transcript_text)
+            embeddings = ChunkingService.batch_embeddings(chunk_texts, db=db)
+
+            # The activation toggle updates the transcript row before its chunks, so holding
+            # a share lock on it means the chunks are written with the current flag. Locked
+            # before the job, in the same order as a transcript delete cascading to its job.
+            active = db.execute(
+                select(Transcript.active)
+                    .where(Transcript.id == transcript_id)
+                    .with_for_update(read=True)
+            ).scalar()
+            job = IngestionService.lock_claim(db, job_id, attempt)
+            if not job:
+                db.rollback()
+                print(f"Ingestion job {job_id} attempt {attempt} no longer owns the job, discarding its chunks")
+                return
+            db.execute(
+                delete(Chunk)
+                    .where(Chunk.transcript_id == transcript_id)
+                    .execution_options(synchronize_session=False)
+            )
+            chunk_count = ChunkWriter.write(db, transcript_id, chunk_texts, embeddings, active)
+
+            job.status = JobStatus.SUCCEEDED
+            job.chunk_count = chunk_count
+            job.error = None
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            # New chunks are searchable now, so previously cached answers may be stale
+            SemanticCache.invalidate_all()
+            print(f"Ingestion job {job_id} completed: {chunk_count} chunks for transcript {transcript_id}")
+
+        except Exception as e:
+            print(f"Ingestion job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+            db.rollback()
+            if attempt is not None:
+                job = IngestionService.lock_claim(db, job_id, attempt)
+            else:
+                job = IngestionService.get_job(db, job_id)
+            if job:
+                job.error = str(e)
+                if job.attempts < INGESTION_MAX_ATTEMPTS:
+                    job.status = JobStatus.QUEUED
+                else:
+                    job.status = JobStatus.FAILED
+                    job.finished_at = datetime.utcnow()
+                db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def requeue_stale_jobs() -> int:
+        """
+        Return orphaned RUNNING jobs to the queue.
+
+        A job that is only slow (not orphaned) may still be running elsewhere; its
+        worker loses the compare-and-set in lock_claim and discards its results.
+
+        Returns:
+            Number of jobs re-queued
+        """
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(minutes=INGESTION_STALE_MINUTES)
+            count = (
+                db.query(IngestionJob)
+                    .filter(IngestionJob.status == JobStatus.RUNNING, IngestionJob.started_at < cutoff)
+                    .update({IngestionJob.status: JobStatus.QUEUED}, synchronize_session=False)
+            )
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    @staticmethod
+    def _worker_loop() -> None:
+        """Drain the queue, then sleep until notified or the poll interval elapses."""
+        while not IngestionService._stopping.is_set():
+            IngestionService._wakeup.wait(INGESTION_POLL_SECONDS)
+            IngestionService._wakeup.clear()
+            while not IngestionService._stopping.is_set():
+                try:
+                    db = SessionLocal()
+                    try:
+                        job_id = IngestionService.claim_next_job(db)
+                    finally:
+                        db.close()
+                except Exception as e:
+                    print(f"Ingestion worker could not claim a job: {str(e)}")
+                    traceback.print_exc()
+                    break
+                if job_id is None:
+                    break
+                IngestionService.run_job(job_id)
+
+    @staticmethod
+    def start(num_workers: int = INGESTION_WORKERS) -> None:
+        """
+        Start the ingestion worker threads.
+
+        Args:
+            num_workers: Number of worker threads (0 disables in-process workers)
+        """
+        if IngestionService._workers or num_workers <= 0:
+            return
+
+        try:
+            requeued = IngestionService.requeue_stale_jobs()
+            if requeued:
+                print(f"Re-queued {requeued} stale ingestion jobs")
+        except Exception as e:
+            print(f"Warning: Could not re-queue stale ingestion jobs: {str(e)}")
+
+        IngestionService._stopping.clear()
+        for index in range(num_workers):
+            worker = threading.Thread(
+                target=IngestionService._worker_loop,
+                name=f"ingestion-worker-{index}",
+                daemon=True
+            )
+            worker.start()
+            IngestionService._workers.append(worker)
+        # Pick up anything queued while no workers were running
+        IngestionService.notify()
+        print(f"✅ Started {num_workers} ingestion workers")
+
+    @staticmethod
+    def stop(timeout: float = 30.0) -> None:
+        """
+        Stop the worker threads, letting in-flight jobs finish.
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        IngestionService._stopping.set()
+        IngestionService._wakeup.set()
+        for worker in IngestionService._workers:
+            worker.join(timeout)
+        IngestionService._workers = []
@@ -0,0 +1,103 @@
+"""
+In-process metrics registry.
+
+Counters, gauges and simple summaries (count/sum/min/max/last) kept per
+worker process and exposed through GET /metrics.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Thread-safe counters, gauges and summaries keyed by dotted metric names."""
+
+    _lock = threading.Lock()
+    _counters: dict[str, float] = {}
+    _gauges: dict[str, float] = {}
+    _summaries: dict[str, dict] = {}
+
+    @staticmethod
+    def increment(name: str, value: float = 1) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name: Metric name, e.g. "embedding.batches"
+            value: Amount to add
+        """
+        with Metrics._lock:
+            Metrics._counters[name] = Metrics._counters.get(name, 0) + value
+
+    @staticmethod
+    def set_gauge(name: str, value: float) -> None:
+        """
+        Set a gauge to its current value.
+
+        Args:
+            name: Metric name, e.g. "cache.query_embedding.size"
+            value: Current value
+        """
+        with Metrics._lock:
+            Metrics._gauges[name] = value
+
+    @staticmethod
+    def observe(name: str, value: float) -> None:
+        """
+        Record one observation of a measured value.
+
+        Args:
+            name: Metric name, e.g. "embedding.batch_fill_ratio"
+            value: Observed value
+        """
+        with Metrics._lock:
+            summary = Metrics._summaries.get(name)
+            if summary is None:
+                Metrics._summaries[name] = {"count": 1, "sum": value, "min": value, "max": value, "last": value}
+                return
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["min"] = min(summary["min"], value)
+            summary["max"] = max(summary["max"], value)
+            summary["last"] = value
+
+    @staticmethod
+    @contextmanager
+    def timer(name: str):
+        """
+        Observe the wall-clock seconds spent in a with-block.
+
+        Args:
+            name: Metric name, e.g. "query.stage.retrieve_seconds"
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            Metrics.observe(name, time.perf_counter() - started)
+
+    @staticmethod
+    def snapshot() -> dict:
+        """
+        Get a copy of all metrics.
+
+        Returns:
+            Dictionary with "counters", "gauges" and "summaries" (summaries include the mean)
+        """
+        with Metrics._lock:
+            counters = dict(Metrics._counters)
+            gauges = dict(Metrics._gauges)
+            summaries = {
+                name: {**summary, "mean": summary["sum"] / summary["count"]}
+                for name, summary in Metrics._summaries.items()
+            }
+        return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+    @staticmethod
+    def reset() -> None:
+        """Clear all metrics."""
+        with Metrics._lock:
+            Metrics._counters.clear()
+            Metrics._gauges.clear()
+            Metrics._summaries.clear()
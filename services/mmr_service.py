@@ -0,0 +1,82 @@
+"""
+Maximal marginal relevance (MMR) selection of retrieved chunks.
+
+Chunks overlap by CHUNK_OVERLAP characters, so plain top-k retrieval tends to
+return several neighbouring chunks of the same transcript that say the same
+thing. MMR picks from a larger candidate set one chunk at a time, trading
+relevance to the question against similarity to the chunks already picked:
+
+    score(c) = lambda * relevance(c) - (1 - lambda) * max_similarity(c, picked)
+
+lambda = 1 is plain relevance ranking, lower values favour diversity.
+"""
+
+import os
+
+import numpy as np
+
+MMR_ENABLED = os.getenv("MMR_ENABLED", "true").lower() == "true"
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+# Candidates retrieved before diversification (should be well above the final chunk count)
+MMR_CANDIDATES = int(os.getenv("MMR_CANDIDATES", "30"))
+
+
+class MMRService:
+    """Vectorized MMR over candidate embeddings."""
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @staticmethod
+    def select(
+        query_embedding,
+        candidate_embeddings: list,
+        k: int,
+        lambda_mult: float = MMR_LAMBDA,
+        ranked: bool = False
+    ) -> list[int]:
+        """
+        Choose k diverse, relevant candidates.
+
+        Args:
+            query_embedding: Embedding of the question
+            candidate_embeddings: Embeddings of the candidates
+            k: Number of candidates to select
+            lambda_mult: Relevance/diversity trade-off in [0, 1]
+            ranked: Candidates are already in relevance order (e.g. fused hybrid
+                ranking). Relevance then follows that order, spread over the range
+                of the candidates' similarities to the question so it stays on the
+                same scale as the redundancy penalty.
+
+        Returns:
+            Indices into candidate_embeddings, in selection order
+        """
+        n = len(candidate_embeddings)
+        if n <= k:
+            return list(range(n))
+
+        candidates = MMRService._normalize_rows(np.asarray(candidate_embeddings, dtype=np.float32))
+        query = MMRService._normalize_rows(np.asarray(query_embedding, dtype=np.float32))
+
+        relevance = candidates @ query
+        if ranked:
+            relevance = np.linspace(relevance.max(), relevance.min(), n, dtype=np.float32)
+        similarity = candidates @ candidates.T
+
+        selected = [int(np.argmax(relevance))]
+        max_similarity = similarity[:, selected[0]].copy()
+        available = np.ones(n, dtype=bool)
+        available[selected[0]] = False
+
+        while len(selected) < k:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+            scores[~available] = -np.inf
+            pick = int(np.argmax(scores))
+            selected.append(pick)
+            available[pick] = False
+            np.maximum(max_similarity, similarity[:, pick], out=max_similarity)
+
+        return selected
@@ -0,0 +1,120 @@
+"""
+Process-wide OpenAI clients.
+
+Each OpenAI client owns an httpx connection pool, so constructing one per call
+pays for a new pool, DNS lookup and TLS handshake every time. The clients here
+are built once per process with tuned pool limits, timeouts and retries and
+reused by every service; keep-alive connections are shared across requests
+(and across threads for the sync client). HTTP/2 is used when the optional
+h2 package is installed.
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+import openai
+
+# Timeouts for every OpenAI call (seconds)
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+
+# Retries performed by the client itself (callers with their own backoff request 0)
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+# Connection pool limits per client
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "30"))
+
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "true").lower() == "true"
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])."""
+    if not OPENAI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _http_client_options() -> dict:
+    return {
+        "http2": _http2_available(),
+        "timeout": httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS),
+        "limits": httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def _sync_client() -> openai.OpenAI:
+    return openai.OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=openai.DefaultHttpxClient(**_http_client_options())
+    )
+
+
+@lru_cache(maxsize=None)
+def _async_client() -> openai.AsyncOpenAI:
+    return openai.AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=openai.DefaultAsyncHttpxClient(**_http_client_options())
+    )
+
+
+class OpenAIClientProvider:
+    """Hands out the shared OpenAI clients."""
+
+    @staticmethod
+    def get_client(max_retries: Optional[int] = None) -> openai.OpenAI:
+        """
+        Get the shared synchronous client (thread-safe).
+
+        Args:
+            max_retries: Override the client's retry count; the returned copy
+                shares the same connection pool
+
+        Returns:
+            OpenAI client
+        """
+        client = _sync_client()
+        if max_retries is not None and max_retries != client.max_retries:
+            return client.with_options(max_retries=max_retries)
+        return client
+
+    @staticmethod
+    def get_async_client(max_retries: Optional[int] = None) -> openai.AsyncOpenAI:
+        """
+        Get the shared asynchronous client.
+
+        Args:
+            max_retries: Override the client's retry count; the returned copy
+                shares the same connection pool
+
+        Returns:
+            AsyncOpenAI client
+        """
+        client = _async_client()
+        if max_retries is not None and max_retries != client.max_retries:
+            return client.with_options(max_retries=max_retries)
+        return client
+
+    @staticmethod
+    async def close() -> None:
+        """Close the shared clients' connection pools (call on shutdown)."""
+        if _sync_client.cache_info().currsize:
+            _sync_client().close()
+            _sync_client.cache_clear()
+        if _async_client.cache_info().currsize:
+            await _async_client().close()
+            _async_client.cache_clear()
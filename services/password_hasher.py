@@ -0,0 +1,124 @@
+"""
+bcrypt hashing and verification on a dedicated process pool.
+
+bcrypt is deliberately slow (~200-300 ms of CPU per call) and holds the GIL
+while it runs, so running it in request handlers or the default threadpool
+lets a burst of logins starve every other request in the worker. Password
+operations instead go to a small process pool sized by PASSWORD_HASH_WORKERS.
+At most PASSWORD_HASH_MAX_PENDING operations may be queued or running at
+once; beyond that callers get PasswordHasherBusy right away instead of
+waiting in an unbounded queue.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from .metrics import Metrics
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Password hashing context using bcrypt
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with bcrypt (runs in a pool process)."""
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its bcrypt hash (runs in a pool process)."""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already pending."""
+
+
+class PasswordHasher:
+    """Async front end for the password hashing process pool."""
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _pending = 0
+
+    @staticmethod
+    def start(num_workers: int = PASSWORD_HASH_WORKERS) -> None:
+        """
+        Create the process pool (otherwise it is created on first use).
+
+        Args:
+            num_workers: Number of hashing processes
+        """
+        if PasswordHasher._executor is not None:
+            return
+        # forkserver avoids forking a process that already runs threads and an event loop
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        PasswordHasher._executor = ProcessPoolExecutor(max_workers=max(1, num_workers), mp_context=context)
+
+    @staticmethod
+    def stop() -> None:
+        """Shut down the process pool."""
+        executor = PasswordHasher._executor
+        PasswordHasher._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    async def _run(operation: str, func, *args):
+        if PasswordHasher._pending >= PASSWORD_HASH_MAX_PENDING:
+            Metrics.increment("auth.password_pool.rejected")
+            raise PasswordHasherBusy("Too many password operations in progress, try again shortly")
+
+        PasswordHasher.start()
+        PasswordHasher._pending += 1
+        Metrics.set_gauge("auth.password_pool.pending", PasswordHasher._pending)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(PasswordHasher._executor, func, *args)
+        finally:
+            PasswordHasher._pending -= 1
+            Metrics.set_gauge("auth.password_pool.pending", PasswordHasher._pending)
+            # Includes time spent queued behind other operations
+            Metrics.observe(f"auth.password_{operation}_seconds", time.perf_counter() - started)
+
+    @staticmethod
+    async def hash(password: str) -> str:
+        """
+        Hash a password without blocking the event loop.
+
+        Args:
+            password: Plain text password
+
+        Returns:
+            Hashed password string
+
+        Raises:
+            PasswordHasherBusy: If the pool's queue is full
+        """
+        return await PasswordHasher._run("hash", hash_password, password)
+
+    @staticmethod
+    async def verify(plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password without blocking the event loop.
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+
+        Returns:
+            True if password matches, False otherwise
+
+        Raises:
+            PasswordHasherBusy: If the pool's queue is full
+        """
+        return await PasswordHasher._run("verify", verify_password, plain_password, hashed_password)
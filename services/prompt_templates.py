@@ -0,0 +1,102 @@
+"""
+Prompt templates for answer generation.
+
+Every template puts all static text first, in the system message, and the
+per-query parts (retrieved context, then the question) last, in the user
+message. The system message is therefore byte-identical across queries,
+which lets the provider's prompt caching reuse the prefix and cuts
+time-to-first-token and input cost. Keep templates free of per-query
+values such as dates or user names for the same reason.
+"""
+
+import os
+import textwrap
+
+
+class PromptTemplate:
+    """A static system prompt plus the layout of the per-query user message."""
+
+    def __init__(self, name: str, system: str, context_heading: str, question_heading: str):
+        self.name = name
+        self.system = system
+        self.context_heading = context_heading
+        self.question_heading = question_heading
+
+    def __repr__(self) -> str:
+        return f"<PromptTemplate(name='{self.name}')>"
+
+    def render_messages(self, context: str, question: str) -> list[dict]:
+        """
+        Build the chat messages for one query.
+
+        Args:
+            context: Formatted context section
+            question: The user's question
+
+        Returns:
+            Chat completion messages (system, then user)
+        """
+        user_message = "".join([self.context_heading, "\n", context, "\n", self.question_heading, "\n", question])
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": user_message}
+        ]
+
+
+SALES_TRAINER_TEMPLATE = PromptTemplate(
+    name="sales_trainer",
+    system=textwrap.dedent("""\
+        ### Identity ####
+        You are an AI sales trainer. Your main goal is to use the content of other experience sales trainers
+        in order to answer questions and give specific examples. You are fair, but will not sugarcoat the truth.
+
+        ### Guidelines ###
+        Rather than invent or turn to the internet for answers, use the given context to formulate answers.
+        Whenever possible, use specific quotes from the videos. You may paraphrase these quotes to make them more
+        legible and readable.
+        When not quoting directly, summarize the main ideas contained in the context you are given. Be as specific
+        and direct as possible.
+        Finally, and most importantly, give specific suggestion about how the salesperson could handle real or
+        hypothetical situations. Take the suggestions of the sales trainers and turn them into different variations
+        of suggested quotes. The goal is to give the salesperson several different way to handle a situation that
+        are very specific.
+
+        The salesperson has asked a very specific question, given at the end of their message after the context.
+
+        Your response should follow this format:
+
+        Give a short summary of the most import advice found in the context. This can be more general.
+        Then, give 1-6 specific key points that the salesperson could potentially user.
+        These key points should be organized around the trainers given in the context. For example, explain how trainer 1
+        must address the issues, and generate several specific quotes that could be used. Then examplain how trainer 2 might
+        solve the problem, and generate several specific quotes that could be used. You can use as many trainers or chunks of
+        context necessary to specifically answer the question.
+        """),
+    context_heading="Here are the chunks as well as some additional details about each one:",
+    question_heading="The question is:"
+)
+
+PROMPT_TEMPLATES = {
+    SALES_TRAINER_TEMPLATE.name: SALES_TRAINER_TEMPLATE,
+}
+
+PROMPT_TEMPLATE = os.getenv("PROMPT_TEMPLATE", SALES_TRAINER_TEMPLATE.name)
+
+
+def get_prompt_template(name: str = PROMPT_TEMPLATE) -> PromptTemplate:
+    """
+    Look up a registered prompt template.
+
+    Args:
+        name: Template name
+
+    Returns:
+        The PromptTemplate
+
+    Raises:
+        ValueError: If no template with that name is registered
+    """
+    try:
+        return PROMPT_TEMPLATES[name]
+    except KeyError:
+        raise ValueError(f"Unknown prompt template '{name}'. Available: {', '.join(sorted(PROMPT_TEMPLATES))}")
@@ -1,89 +1,442 @@
-from openai import OpenAI
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, cast, literal, literal_column, union_all, Float
+from typing import Optional
 from models.chunk import Chunk
+from models.transcript import Transcript
+import hashlib
 import os
-from .chunking_service import ChunkingService
+import numpy as np
+from .chunking_service import ChunkingService, EMBEDDING_MODEL
+from .cache import create_cache, run_cache_call
+from .openai_client import OpenAIClientProvider
+from .semantic_cache import SemanticCache
+from .context_assembler import ContextAssembler, ContextPassage
+from .context_builder import ContextBuilder
+from .prompt_templates import get_prompt_template
+from .metrics import Metrics
+from .token_counter import TokenCounter
+from .mmr_service import MMRService, MMR_ENABLED, MMR_LAMBDA, MMR_CANDIDATES
+from .reranker import RerankService, RERANKER, RERANK_CANDIDATES
+from .retrieved_chunk import RetrievedChunk
 
+# Recall/latency knobs for the approximate nearest neighbour index on chunks.embedding.
+# Higher values scan more of the index: better recall, slower queries.
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", "1"))
 
+# Hybrid retrieval: vector and full-text candidates fused with weighted reciprocal rank fusion,
+# score(chunk) = sum over retrievers of weight / (RRF_K + rank)
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "40"))  # per retriever
+RRF_K = int(os.getenv("RRF_K", "60"))
+RRF_VECTOR_WEIGHT = float(os.getenv("RRF_VECTOR_WEIGHT", "1.0"))
+RRF_LEXICAL_WEIGHT = float(os.getenv("RRF_LEXICAL_WEIGHT", "1.0"))
+
+# Must match the text search configuration of the chunks.search_vector trigger
+TEXT_SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# Number of chunks passed to the prompt
+NUM_CONTEXT_CHUNKS = 10
+
+COMPLETION_MODEL = "gpt-4o-mini"
+
+# Question embedding cache: common questions skip the embeddings round trip
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2000"))
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "86400"))
+
+query_embedding_cache = create_cache(
+    "query_embedding",
+    max_size=QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=QUERY_EMBEDDING_CACHE_TTL_SECONDS
+)
 
 class QueryService:
     def __init__(self):
         pass
     @staticmethod
-    def process_query(question: str, db: Session):
-        embedding : list[float] = ChunkingService.get_embeddings([question])[0]
-        related_chunks = QueryService.get_closest_chunks(embedding, 10, db)
-        prompt = QueryService.build_basic_prompt(question, related_chunks, db)
-        answer = QueryService.run_query(prompt)
+    async def process_query(question: str, db: AsyncSession, ef_search: Optional[int] = None, probes: Optional[int] = None,
+                            mmr_lambda: Optional[float] = None):
+        prepared = await QueryService.prepare_query(question, db, ef_search=ef_search, probes=probes, mmr_lambda=mmr_lambda)
+        if prepared["cached_answer"] is not None:
+            return prepared["cached_answer"]
+        answer = await QueryService.run_query(prepared["messages"])
+        await run_cache_call(QueryService.cache_answer, prepared, answer)
         return answer
 
+    @staticmethod
+    async def prepare_query(question: str, db: AsyncSession, ef_search: Optional[int] = None, probes: Optional[int] = None,
+                            mmr_lambda: Optional[float] = None) -> dict:
+        """
+        Do all database and embedding work for a query, up to (not including) the completion.
+
+        The result holds only plain data, so it stays usable after the session is closed
+        (e.g. while a streaming response is being sent).
+
+        Args:
+            question: The user's question
+            db: Database session
+            ef_search: Optional HNSW recall knob
+            probes: Optional IVFFlat recall knob
+            mmr_lambda: Optional relevance/diversity trade-off for MMR
+
+        Returns:
+            Dictionary with question, embedding, corpus_version, chunk_ids, sources,
+            messages and prompt_tokens (None on a cache hit) and cached_answer (None on a cache miss)
+        """
+        corpus_version = await run_cache_call(SemanticCache.corpus_version)
+        with Metrics.timer("query.stage.embed_seconds"):
+            embedding : np.ndarray = await QueryService.get_question_embedding(question)
+        prepared = {
+            "question": question,
+            "embedding": embedding,
+            "corpus_version": corpus_version,
+            "messages": None,
+            "prompt_tokens": None,
+            "cached_answer": None
+        }
+
+        cached = await run_cache_call(SemanticCache.lookup, embedding)
+        if cached:
+            # The entry carries its sources, so a hit needs no database round trip
+            prepared["cached_answer"] = cached["answer"]
+            prepared["chunk_ids"] = cached["chunk_ids"]
+            prepared["sources"] = cached["sources"]
+            return prepared
+
+        related_chunks = await QueryService.retrieve_chunks(
+            question, embedding, NUM_CONTEXT_CHUNKS, db,
+            ef_search=ef_search, probes=probes, mmr_lambda=mmr_lambda
+        )
+        with Metrics.timer("query.stage.assemble_seconds"):
+            passages = await ContextAssembler.assemble(related_chunks, db)
+        with Metrics.timer("query.stage.prompt_seconds"):
+            prepared["messages"], prepared["prompt_tokens"] = QueryService.build_basic_prompt(question, passages)
+
+        prepared["chunk_ids"] = [chunk.id for chunk in related_chunks]
+        prepared["sources"] = QueryService.get_sources(related_chunks)
+        return prepared
+
+    @staticmethod
+    async def retrieve_chunks(question: str, embedding: np.ndarray, num_chunks: int, db: AsyncSession,
+                              ef_search: Optional[int] = None, probes: Optional[int] = None,
+                              mmr_lambda: Optional[float] = None) -> list[RetrievedChunk]:
+        """
+        Retrieve the chunks to answer a question from.
+
+        Over-fetches candidates (hybrid or vector-only search), reorders them with
+        the local reranker, keeps the best MMR_CANDIDATES and narrows those down to
+        num_chunks with maximal marginal relevance, so overlapping neighbours of the
+        same passage don't crowd out other sources. Each stage is timed as
+        query.stage.<stage>_seconds.
+
+        Args:
+            question: The user's question
+            embedding: Embedding of the question
+            num_chunks: Number of chunks to return
+            db: Database session
+            ef_search: Optional HNSW recall knob
+            probes: Optional IVFFlat recall knob
+            mmr_lambda: Optional relevance/diversity trade-off (defaults to MMR_LAMBDA)
+
+        Returns:
+            Selected chunks, most relevant first
+        """
+        rerank_enabled = RERANKER != "none"
+        num_selected = max(MMR_CANDIDATES, num_chunks) if MMR_ENABLED else num_chunks
+        num_candidates = max(RERANK_CANDIDATES, num_selected) if rerank_enabled else num_selected
+
+        with Metrics.timer("query.stage.retrieve_seconds"):
+            if HYBRID_SEARCH_ENABLED:
+                candidates = await QueryService.get_hybrid_chunks(question, embedding, num_candidates, db, ef_search=ef_search, probes=probes)
+            else:
+                candidates = await QueryService.get_closest_chunks(embedding, num_candidates, db, ef_search=ef_search, probes=probes)
+
+        if rerank_enabled and len(candidates) > 1:
+            with Metrics.timer("query.stage.rerank_seconds"):
+                order = await RerankService.rerank(question, [chunk.chunk_text for chunk in candidates])
+            candidates = [candidates[index] for index in order[:num_selected]]
+
+        if len(candidates) <= num_chunks:
+            return list(candidates)
+        with Metrics.timer("query.stage.mmr_seconds"):
+            selected = MMRService.select(
+                embedding,
+                [chunk.embedding for chunk in candidates],
+                num_chunks,
+                lambda_mult=mmr_lambda if mmr_lambda is not None else MMR_LAMBDA,
+                ranked=HYBRID_SEARCH_ENABLED or rerank_enabled
+            )
+        return [candidates[index] for index in selected]
+
+    @staticmethod
+    def cache_answer(prepared: dict, answer: str):
+        """Store a freshly generated answer in the semantic cache."""
+        SemanticCache.store(
+            prepared["question"],
+            prepared["embedding"],
+            prepared["chunk_ids"],
+            prepared["sources"],
+            answer,
+            prepared["corpus_version"]
+        )
+
+    @staticmethod
+    def get_sources(related_chunks: list[RetrievedChunk]) -> list[dict]:
+        """Chunk and transcript metadata the UI shows as sources for an answer."""
+        return [
+            {
+                "chunk_id": chunk.id,
+                "transcript_id": chunk.transcript_id,
+                "chunk_index": chunk.chunk_index,
+                "trainer_name": chunk.trainer_name,
+                "title": chunk.title,
+                "source_url": chunk.source_url,
+                "media_type": chunk.media_type
+            }
+            for chunk in related_chunks
+        ]
+
+    @staticmethod
+    async def stream_answer(prepared: dict):
+        """
+        Generate the answer for a prepared query as a sequence of (event, data) pairs.
+
+        Sources are emitted first so they can be rendered before the first token
+        arrives, then one "token" event per completion delta, then "done".
+        A semantic cache hit is sent as a single token event.
+        """
+        yield "sources", {"sources": prepared["sources"]}
+
+        if prepared["cached_answer"] is not None:
+            yield "token", {"text": prepared["cached_answer"]}
+            yield "done", {"cached": True}
+            return
+
+        parts : list[str] = []
+        async for text in QueryService.run_query_stream(prepared["messages"]):
+            parts.append(text)
+            yield "token", {"text": text}
+        await run_cache_call(QueryService.cache_answer, prepared, "".join(parts))
+        yield "done", {"cached": False}
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """Case-fold and collapse whitespace so trivially different phrasings share a cache entry."""
+        return " ".join(question.casefold().split())
+
+    @staticmethod
+    async def get_question_embedding(question: str) -> np.ndarray:
+        """
+        Embed a question, serving repeated questions from the query embedding cache.
+
+        Only the cache key uses the normalized question; the question is embedded
+        exactly as the user typed it.
+
+        Args:
+            question: The user's question
+
+        Returns:
+            Embedding of the question (float32 array)
+        """
+        normalized = QueryService.normalize_question(question)
+        key = f"{EMBEDDING_MODEL}:{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}"
+        cached = await run_cache_call(query_embedding_cache.get, key)
+        if cached is not None:
+            return ChunkingService.decode_embedding(cached)
+        embedding = (await ChunkingService.request_embeddings_async([question]))[0]
+        # Stored as base64 so every cache backend (including JSON-encoded Redis) can hold it compactly
+        await run_cache_call(query_embedding_cache.set, key, ChunkingService.encode_embedding(embedding))
+        return embedding
 
     @staticmethod   
-    def get_closest_chunks(embedding: list[float], num_chunks: int, db: Session):
+    async def set_search_params(db: AsyncSession, ef_search: Optional[int] = None, probes: Optional[int] = None):
+        """
+        Set the ANN index search parameters for the current transaction.
+
+        Both settings are applied so the query behaves the same whether the
+        database carries the HNSW or the IVFFlat index. They are scoped to the
+        transaction (set_config(..., true)), so pooled connections are not affected.
+
+        Args:
+            db: Database session
+            ef_search: HNSW candidate list size (defaults to HNSW_EF_SEARCH)
+            probes: Number of IVFFlat lists to probe (defaults to IVFFLAT_PROBES)
+        """
+        ef_search = ef_search or HNSW_EF_SEARCH
+        probes = probes or IVFFLAT_PROBES
+        await db.execute(select(
+            func.set_config("hnsw.ef_search", str(ef_search), True),
+            func.set_config("ivfflat.probes", str(probes), True)
+        ))
+
+    @staticmethod
+    async def get_closest_chunks(embedding: np.ndarray, num_chunks: int, db: AsyncSession,
+                           ef_search: Optional[int] = None, probes: Optional[int] = None) -> list[RetrievedChunk]:
+        # ef_search bounds how many results HNSW can return, so never go below the limit
+        await QueryService.set_search_params(db, max(ef_search or HNSW_EF_SEARCH, num_chunks), probes)
+        distance = Chunk.embedding.cosine_distance(embedding)
         sqlstmt = (
-            select(Chunk)
-                .options(joinedload(Chunk.transcript))  # load related transcript
-                .order_by(Chunk.embedding.cosine_distance(embedding))  # or .cosine_similarity
+            select(*RetrievedChunk.columns(score=1 - distance, with_embedding=MMR_ENABLED))
+                .join(Transcript, Transcript.id == Chunk.transcript_id)
+                .where(Chunk.active)  # matches the partial ANN index predicate
+                .order_by(distance)
                 .limit(num_chunks)
         )
-        chunks = db.execute(sqlstmt).scalars().all()
-        return chunks
+        result = await db.execute(sqlstmt)
+        return RetrievedChunk.from_rows(result.all())
 
     @staticmethod
-    def run_query(prompt: str):
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}]
+    async def get_hybrid_chunks(question: str, embedding: np.ndarray, num_chunks: int, db: AsyncSession,
+                                ef_search: Optional[int] = None, probes: Optional[int] = None,
+                                candidates: int = HYBRID_CANDIDATES) -> list[RetrievedChunk]:
+        """
+        Retrieve chunks by fusing vector similarity and full-text rankings in one query.
+
+        The nearest neighbours (ANN index) and the best full-text matches (GIN index,
+        websearch syntax so quoted phrases work) are each ranked, then combined with
+        weighted reciprocal rank fusion. Both retrievers, the fusion and the final
+        fetch run as a single statement, i.e. one round trip.
+
+        Args:
+            question: The user's question, used for the full-text query
+            embedding: Embedding of the question
+            num_chunks: Number of fused results to return
+            db: Database session
+            ef_search: Optional HNSW recall knob
+            probes: Optional IVFFlat recall knob
+            candidates: Results taken from each retriever before fusion
+
+        Returns:
+            Retrieved chunks, best fused score first
+        """
+        candidates = max(candidates, num_chunks)
+        await QueryService.set_search_params(db, max(ef_search or HNSW_EF_SEARCH, candidates), probes)
+
+        distance = Chunk.embedding.cosine_distance(embedding)
+        vector_hits = (
+            select(Chunk.id.label("id"), distance.label("distance"))
+                .where(Chunk.active)
+                .order_by(distance)
+                .limit(candidates)
+                .subquery("vector_hits")
         )
+        vector_ranked = select(
+            vector_hits.c.id,
+            func.row_number().over(order_by=vector_hits.c.distance).label("rank")
+        ).cte("vector_ranked")
+
+        tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, question)
+        text_rank = func.ts_rank_cd(Chunk.search_vector, tsquery)
+        lexical_hits = (
+            select(Chunk.id.label("id"), text_rank.label("text_rank"))
+                .where(Chunk.active, Chunk.search_vector.op("@@")(tsquery))
+                .order_by(text_rank.desc())
+                .limit(candidates)
+                .subquery("lexical_hits")
+        )
+        lexical_ranked = select(
+            lexical_hits.c.id,
+            func.row_number().over(order_by=lexical_hits.c.text_rank.desc()).label("rank")
+        ).cte("lexical_ranked")
+
+        rrf_scores = union_all(
+            select(vector_ranked.c.id, (cast(literal(RRF_VECTOR_WEIGHT), Float) / (RRF_K + vector_ranked.c.rank)).label("score")),
+            select(lexical_ranked.c.id, (cast(literal(RRF_LEXICAL_WEIGHT), Float) / (RRF_K + lexical_ranked.c.rank)).label("score"))
+        ).subquery("rrf_scores")
+        fused = (
+            select(rrf_scores.c.id, func.sum(rrf_scores.c.score).label("score"))
+                .group_by(rrf_scores.c.id)
+                .order_by(func.sum(rrf_scores.c.score).desc())
+                .limit(num_chunks)
+                .cte("fused")
+        )
+
+        sqlstmt = (
+            select(*RetrievedChunk.columns(score=fused.c.score, with_embedding=MMR_ENABLED))
+                .select_from(Chunk)
+                .join(fused, fused.c.id == Chunk.id)
+                .join(Transcript, Transcript.id == Chunk.transcript_id)
+                .order_by(fused.c.score.desc(), Chunk.id)
+        )
+        result = await db.execute(sqlstmt)
+        return RetrievedChunk.from_rows(result.all())
+
+    @staticmethod
+    async def run_query(messages: list[dict]):
+        client = OpenAIClientProvider.get_async_client()
+        with Metrics.timer("query.stage.completion_seconds"):
+            response = await client.chat.completions.create(
+                model=COMPLETION_MODEL,
+                messages=messages
+            )
+        QueryService.record_completion_usage(response.usage)
         return response.choices[0].message.content
 
+    @staticmethod
+    async def run_query_stream(messages: list[dict]):
+        """Yield the completion text incrementally as the model produces it."""
+        client = OpenAIClientProvider.get_async_client()
+        stream = await client.chat.completions.create(
+            model=COMPLETION_MODEL,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            if chunk.usage:
+                # Sent in a final chunk without choices
+                QueryService.record_completion_usage(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
     @staticmethod
-    def build_basic_prompt(question: str, related_chunks: list[Chunk], db: Session):
-
-        prompt = """
-        ### Identity ####
-        You are an AI sales trainer. Your main goal is to use the content of other experience sales trainers
-        in order to answer questions and give specific examples. You are fair, but will not sugarcoat the truth.
-
-        ### Guidelines ###
-        Rather than invent or turn to the internet for answers, use the given context to formulate answers. 
-        Whenever possible, use specific quotes from the videos. You may paraphrase these quotes to make them more
-        legible and readable. 
-        When not quoting directly, summarize the main ideas contained in the context you are given. Be as specific 
-        and direct as possible. 
-        Finally, and most importantly, give specific suggestion about how the salesperson could handle real or 
-        hypothetical situations. Take the suggestions of the sales trainers and turn them into different variations
-        of suggested quotes. The goal is to give the salesperson several different way to handle a situation that 
-        are very specific.  
-
-        The salesperson has asked a very specific question: 
-        The question is: """ + question + """
-
-        Your response should follow this format:
-
-        Give a short summary of the most import advice found in the context. This can be more general. 
-        Then, give 1-6 specific key points that the salesperson could potentially user. 
-        These key points should be organized around the trainers given in the context. For example, explain how trainer 1
-        must address the issues, and generate several specific quotes that could be used. Then examplain how trainer 2 might 
-        solve the problem, and generate several specific quotes that could be used. You can use as many trainers or chunks of 
-        context necessary to specifically answer the question.  
-
-          
-        Here are the chunks as will as some additional details about each one: 
+    def record_completion_usage(usage) -> None:
+        """Record prompt tokens, including how many were served from the provider's prompt cache."""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+        Metrics.increment("completion.prompt_tokens", usage.prompt_tokens)
+        Metrics.increment("completion.cached_prompt_tokens", cached_tokens)
+        Metrics.increment("completion.completion_tokens", usage.completion_tokens)
+
+
+    @staticmethod
+    def build_basic_prompt(question: str, passages: list[ContextPassage]) -> tuple[list[dict], dict]:
         """
-        prompt += "--------------------------------\n"
-        for index, chunk in enumerate(related_chunks):
-            prompt += "Chunk " + str(index) + ":\n"
-            if (chunk.transcript.trainer_name):
-                prompt += "Trainer: " + chunk.transcript.trainer_name + "\n"
-            if (chunk.chunk_text):
-                prompt += "Chunk: " + chunk.chunk_text + "\n"
-            prompt += "--------------------------------\n"
-
-        return prompt
+        Build the answer prompt from the question and the retrieved passages.
+
+        Static instructions come first (system message) and the context and
+        question last, so the prompt prefix is identical across queries and can
+        be served from the provider's prompt cache. The context section is
+        filled up to CONTEXT_TOKEN_BUDGET tokens.
+
+        Args:
+            question: The user's question
+            passages: Assembled passages, most relevant first
+
+        Returns:
+            Tuple of (chat messages, token usage per section plus context stats)
+        """
+        template = get_prompt_template()
+        context, context_stats = ContextBuilder.build(passages, COMPLETION_MODEL)
+        messages = template.render_messages(context, question)
+
+        token_usage = {
+            "instructions": TokenCounter.count(template.system, COMPLETION_MODEL),
+            "question": TokenCounter.count(question, COMPLETION_MODEL),
+            "context": context_stats["tokens"],
+        }
+        token_usage["total"] = sum(token_usage.values())
+        for section, tokens in token_usage.items():
+            Metrics.observe(f"prompt.{section}_tokens", tokens)
+        Metrics.observe("prompt.passages_skipped", context_stats["passages_skipped"])
+        return messages, {
+            **token_usage,
+            "token_budget": context_stats["token_budget"],
+            "passages_used": context_stats["passages_used"],
+            "passages_skipped": context_stats["passages_skipped"]
+        }
               
                 
 
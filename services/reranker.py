@@ -0,0 +1,199 @@
+"""
+Reranking of retrieved candidates with a local, CPU-only scorer.
+
+Retrieval over-fetches RERANK_CANDIDATES chunks; a reranker scores each
+(question, chunk text) pair and the best-scoring ones move on to MMR and the
+prompt. Scorers are pluggable through the Reranker interface and selected with
+RERANKER:
+
+- "bm25": Okapi BM25 over the candidate set. Pure Python, no model, ~1 ms.
+- "cross_encoder": a small sentence-transformers cross-encoder (by default
+  cross-encoder/ms-marco-MiniLM-L-6-v2) on CPU. The model must already be in
+  the local Hugging Face cache or RERANKER_MODEL must point to a local
+  directory; it is never downloaded at query time. Falls back to BM25 if
+  sentence-transformers or the model is unavailable.
+- "none": keep the retrieval order.
+
+Scoring runs in a dedicated thread pool so it never blocks the event loop.
+"""
+
+import asyncio
+import math
+import os
+import re
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .metrics import Metrics
+
+RERANKER = os.getenv("RERANKER", "bm25")
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "16"))
+RERANKER_THREADS = int(os.getenv("RERANKER_THREADS", "1"))
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "50"))
+# Reranks slower than this are logged and counted as rerank.over_budget
+RERANK_LATENCY_BUDGET_MS = float(os.getenv("RERANK_LATENCY_BUDGET_MS", "150"))
+# Reciprocal rank fusion constant for scorers that are blended with the retrieval order
+RERANK_RRF_K = 60
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Reranker:
+    """Interface for relevance scorers."""
+
+    name = "none"
+    # Blend the scorer's ranking with the retrieval ranking instead of replacing it
+    fuse_with_retrieval = False
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        """
+        Score how relevant each text is to the query (higher is better).
+
+        Args:
+            query: The user's question
+            texts: Candidate texts
+
+        Returns:
+            One score per text, in order
+        """
+        raise NotImplementedError
+
+
+class BM25Reranker(Reranker):
+    """Okapi BM25 with document statistics taken from the candidate set itself."""
+
+    name = "bm25"
+    # BM25 only sees shared words, so on its own it would bury paraphrased (embedding-only) matches
+    fuse_with_retrieval = True
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        documents = [Counter(self.tokenize(text)) for text in texts]
+        lengths = [sum(document.values()) for document in documents]
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        count = len(documents)
+
+        scores = [0.0] * count
+        for term in set(self.tokenize(query)):
+            frequency = sum(1 for document in documents if term in document)
+            if not frequency:
+                continue
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for index, document in enumerate(documents):
+                term_count = document.get(term)
+                if not term_count:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * lengths[index] / (average_length or 1))
+                scores[index] += idf * term_count * (self.k1 + 1) / (term_count + norm)
+        return scores
+
+
+class CrossEncoderReranker(Reranker):
+    """Local sentence-transformers cross-encoder, run on CPU in batches."""
+
+    name = "cross_encoder"
+
+    def __init__(self, model: str = RERANKER_MODEL, batch_size: int = RERANKER_BATCH_SIZE):
+        # Never reach out to the Hugging Face Hub from the query path
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            raise RuntimeError("sentence-transformers is required for RERANKER=cross_encoder. Install with: pip install sentence-transformers")
+        self.model = CrossEncoder(model, device="cpu")
+        self.batch_size = batch_size
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        scores = self.model.predict(
+            [(query, text) for text in texts],
+            batch_size=self.batch_size,
+            show_progress_bar=False
+        )
+        return [float(score) for score in scores]
+
+
+def create_reranker(name: str = RERANKER) -> Optional[Reranker]:
+    """
+    Create the configured reranker.
+
+    Args:
+        name: "bm25", "cross_encoder" or "none"
+
+    Returns:
+        Reranker instance, or None when reranking is disabled
+    """
+    if name == "none":
+        return None
+    if name == "cross_encoder":
+        try:
+            return CrossEncoderReranker()
+        except Exception as e:
+            print(f"⚠️  Warning: Could not load cross-encoder reranker, falling back to BM25: {e}")
+            traceback.print_exc()
+            return BM25Reranker()
+    if name != "bm25":
+        print(f"⚠️  Warning: Unknown reranker '{name}', using BM25")
+    return BM25Reranker()
+
+
+class RerankService:
+    """Runs the configured reranker off the event loop."""
+
+    _reranker: Optional[Reranker] = None
+    _loaded = False
+    _executor = ThreadPoolExecutor(max_workers=max(1, RERANKER_THREADS), thread_name_prefix="rerank")
+
+    @staticmethod
+    def get_reranker() -> Optional[Reranker]:
+        """Get the configured reranker, loading it on first use."""
+        if not RerankService._loaded:
+            RerankService._reranker = create_reranker()
+            RerankService._loaded = True
+        return RerankService._reranker
+
+    @staticmethod
+    async def rerank(query: str, texts: list[str]) -> list[int]:
+        """
+        Order candidates by reranker score.
+
+        Args:
+            query: The user's question
+            texts: Candidate texts, in retrieval order
+
+        Returns:
+            Candidate indices, best first (retrieval order if reranking is disabled)
+        """
+        loop = asyncio.get_running_loop()
+        reranker = RerankService._reranker
+        if not RerankService._loaded:
+            # Loading a model is slow, so do that off the event loop too
+            reranker = await loop.run_in_executor(RerankService._executor, RerankService.get_reranker)
+        if reranker is None or len(texts) <= 1:
+            return list(range(len(texts)))
+
+        started = loop.time()
+        scores = await loop.run_in_executor(RerankService._executor, reranker.score, query, texts)
+        elapsed_ms = (loop.time() - started) * 1000
+        Metrics.observe(f"rerank.{reranker.name}_ms", elapsed_ms)
+        if elapsed_ms > RERANK_LATENCY_BUDGET_MS:
+            Metrics.increment("rerank.over_budget")
+            print(f"⚠️  Reranking {len(texts)} candidates with {reranker.name} took {elapsed_ms:.0f} ms (budget {RERANK_LATENCY_BUDGET_MS:.0f} ms)")
+
+        # Stable sort keeps retrieval order among equal scores (e.g. BM25 zero matches)
+        order = sorted(range(len(texts)), key=lambda index: -scores[index])
+        if not reranker.fuse_with_retrieval:
+            return order
+        fused = [1 / (RERANK_RRF_K + index) for index in range(len(texts))]
+        for rank, index in enumerate(order):
+            fused[index] += 1 / (RERANK_RRF_K + rank)
+        return sorted(range(len(texts)), key=lambda index: -fused[index])
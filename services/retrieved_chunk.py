@@ -0,0 +1,84 @@
+"""
+Lightweight records for chunks on the query hot path.
+
+Retrieval selects plain columns and builds RetrievedChunk records from the
+result rows instead of hydrating identity-mapped Chunk/Transcript ORM
+instances, which are used once per query and then discarded. __slots__ keeps
+construction cheap and the objects small.
+"""
+
+from sqlalchemy import null
+
+from models.chunk import Chunk
+from models.transcript import Transcript
+
+# Columns selected for a RetrievedChunk, in constructor order. Queries append a
+# "score" column and, when embeddings are needed, Chunk.embedding.
+RETRIEVED_CHUNK_COLUMNS = (
+    Chunk.id,
+    Chunk.transcript_id,
+    Chunk.chunk_index,
+    Chunk.chunk_text,
+    Transcript.trainer_name,
+    Transcript.title,
+    Transcript.source_url,
+    Transcript.media_type,
+)
+
+
+class RetrievedChunk:
+    """A retrieved chunk with the transcript metadata shown as its source."""
+
+    __slots__ = (
+        "id",
+        "transcript_id",
+        "chunk_index",
+        "chunk_text",
+        "trainer_name",
+        "title",
+        "source_url",
+        "media_type",
+        "score",
+        "embedding",
+    )
+
+    def __init__(self, id: int, transcript_id: int, chunk_index: int, chunk_text: str,
+                 trainer_name=None, title=None, source_url=None, media_type=None,
+                 score=None, embedding=None):
+        self.id = id
+        self.transcript_id = transcript_id
+        self.chunk_index = chunk_index
+        self.chunk_text = chunk_text
+        self.trainer_name = trainer_name
+        self.title = title
+        self.source_url = source_url
+        self.media_type = media_type
+        # Retrieval score, higher is better (cosine similarity or fused RRF score); None when not ranked
+        self.score = score
+        self.embedding = embedding
+
+    def __repr__(self) -> str:
+        return f"<RetrievedChunk(id={self.id}, transcript_id={self.transcript_id}, chunk_index={self.chunk_index}, score={self.score})>"
+
+    @staticmethod
+    def columns(score=None, with_embedding: bool = False) -> list:
+        """
+        Columns to select for RetrievedChunk.from_rows.
+
+        Args:
+            score: SQL expression for the retrieval score (NULL if omitted)
+            with_embedding: Also select Chunk.embedding (needed for MMR)
+
+        Returns:
+            Column list for select(); join Transcript on Chunk.transcript_id
+        """
+        columns = list(RETRIEVED_CHUNK_COLUMNS)
+        columns.append((score if score is not None else null()).label("score"))
+        if with_embedding:
+            columns.append(Chunk.embedding)
+        return columns
+
+    @staticmethod
+    def from_rows(rows) -> list["RetrievedChunk"]:
+        """Build records from rows selected with RetrievedChunk.columns()."""
+        return [RetrievedChunk(*row) for row in rows]
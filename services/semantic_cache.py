@@ -0,0 +1,175 @@
+"""
+Semantic answer cache for near-duplicate questions.
+
+Stores (question embedding, retrieved chunk ids and sources, answer) and serves the cached
+answer when a new question's embedding is within SEMANTIC_CACHE_THRESHOLD
+cosine similarity of a stored one. Every entry is tagged with the corpus
+version it was answered against; uploads, deletions and (de)activations of
+transcripts bump the version, which invalidates every cached answer. The
+version token lives in the configured cache backend, so with
+CACHE_BACKEND=redis an invalidation in one worker reaches all of them.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+import numpy as np
+
+from .cache import create_cache
+from .metrics import Metrics
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+
+EMBEDDING_DIMENSIONS = 1536
+
+CORPUS_VERSION_KEY = "corpus_version"
+
+# Holds only the corpus version token
+corpus_version_store = create_cache("corpus_version", max_size=1)
+
+
+class SemanticCache:
+    """Process-local ring buffer of answered questions, searched by cosine similarity."""
+
+    _lock = threading.Lock()
+    _matrix = np.zeros((SEMANTIC_CACHE_MAX_ENTRIES, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    _entries: list = [None] * SEMANTIC_CACHE_MAX_ENTRIES
+    _count = 0
+    _next = 0
+    _version: Optional[str] = None
+
+    @staticmethod
+    def corpus_version() -> str:
+        """
+        Get the current corpus version token, creating one if none exists yet.
+
+        Returns:
+            Corpus version token
+        """
+        version = corpus_version_store.get(CORPUS_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            corpus_version_store.set(CORPUS_VERSION_KEY, version)
+        return version
+
+    @staticmethod
+    def invalidate_all() -> None:
+        """Invalidate every cached answer (call when the set of searchable chunks changes)."""
+        corpus_version_store.set(CORPUS_VERSION_KEY, uuid.uuid4().hex)
+        with SemanticCache._lock:
+            SemanticCache._reset()
+        Metrics.increment("semantic_cache.invalidations")
+
+    @staticmethod
+    def _reset() -> None:
+        """Drop all local entries. Caller holds the lock."""
+        SemanticCache._entries = [None] * SEMANTIC_CACHE_MAX_ENTRIES
+        SemanticCache._count = 0
+        SemanticCache._next = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def lookup(embedding) -> Optional[dict]:
+        """
+        Find a cached answer for a semantically equivalent question.
+
+        Args:
+            embedding: Embedding of the new question
+
+        Returns:
+            Cache entry dict (question, answer, chunk_ids, sources, similarity) or None
+        """
+        if not SEMANTIC_CACHE_ENABLED:
+            return None
+
+        version = SemanticCache.corpus_version()
+        query = SemanticCache._normalize(embedding)
+        now = time.monotonic()
+
+        with SemanticCache._lock:
+            if version != SemanticCache._version:
+                # Corpus changed (possibly in another worker): nothing cached here is valid
+                SemanticCache._reset()
+                SemanticCache._version = version
+
+            count = SemanticCache._count
+            entry = None
+            similarity = 0.0
+            if count:
+                similarities = SemanticCache._matrix[:count] @ query
+                for index in np.argsort(-similarities):
+                    if similarities[index] < SEMANTIC_CACHE_THRESHOLD:
+                        break
+                    candidate = SemanticCache._entries[index]
+                    if candidate["expires_at"] > now:
+                        entry = candidate
+                        similarity = float(similarities[index])
+                        break
+
+        if entry is None:
+            Metrics.increment("semantic_cache.misses")
+            return None
+
+        Metrics.increment("semantic_cache.hits")
+        Metrics.observe("semantic_cache.hit_similarity", similarity)
+        return {
+            "question": entry["question"],
+            "answer": entry["answer"],
+            "chunk_ids": entry["chunk_ids"],
+            "sources": entry["sources"],
+            "similarity": similarity
+        }
+
+    @staticmethod
+    def store(question: str, embedding, chunk_ids: list[int], sources: list[dict], answer: str,
+              answered_version: Optional[str] = None) -> None:
+        """
+        Cache an answer. The oldest entry is overwritten once the cache is full.
+
+        Args:
+            question: Question that was answered
+            embedding: Embedding of the question
+            chunk_ids: IDs of the chunks the answer was generated from
+            sources: Source metadata of those chunks, as returned to clients
+            answer: Generated answer
+            answered_version: Corpus version read before retrieval; the answer is
+                not cached if the corpus changed while it was being generated
+        """
+        if not SEMANTIC_CACHE_ENABLED:
+            return
+
+        version = SemanticCache.corpus_version()
+        if answered_version is not None and answered_version != version:
+            return
+        vector = SemanticCache._normalize(embedding)
+
+        with SemanticCache._lock:
+            if version != SemanticCache._version:
+                SemanticCache._reset()
+                SemanticCache._version = version
+
+            index = SemanticCache._next
+            SemanticCache._matrix[index] = vector
+            SemanticCache._entries[index] = {
+                "question": question,
+                "answer": answer,
+                "chunk_ids": list(chunk_ids),
+                "sources": sources,
+                "expires_at": time.monotonic() + SEMANTIC_CACHE_TTL_SECONDS
+            }
+            SemanticCache._next = (index + 1) % SEMANTIC_CACHE_MAX_ENTRIES
+            SemanticCache._count = min(SemanticCache._count + 1, SEMANTIC_CACHE_MAX_ENTRIES)
+            size = SemanticCache._count
+
+        Metrics.set_gauge("semantic_cache.size", size)
@@ -0,0 +1,221 @@
+"""
+Session lookup cache for authenticated requests.
+
+Maps a session key to a snapshot of the user it belongs to (identity, access
+level, query permission and session expiry), so authenticating a request does
+not need a round trip to Postgres. Entries expire after SESSION_CACHE_TTL_SECONDS
+or when the session itself expires, whichever comes first, and are removed
+explicitly on login and logout. Permissions are changed directly in the
+database, so the TTL bounds how long a revoked permission keeps working. With
+CACHE_BACKEND=redis the cache is shared by all worker processes, so an
+invalidation in one worker takes effect everywhere.
+"""
+
+import hashlib
+import os
+from datetime import datetime
+from typing import Optional
+
+from models.user import User, AccessLevel
+from .cache import create_cache
+
+SESSION_CACHE_ENABLED = os.getenv("SESSION_CACHE_ENABLED", "true").lower() == "true"
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+# Upper bound on how long a permission change in the database can go unnoticed; keep it short
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+
+session_cache = create_cache("session", max_size=SESSION_CACHE_SIZE, ttl_seconds=SESSION_CACHE_TTL_SECONDS)
+
+
+class SessionUser:
+    """
+    Read-only snapshot of an authenticated user.
+
+    Exposes the attributes and helpers of User that endpoints and auth
+    dependencies use, without holding a database session.
+    """
+
+    def __init__(
+        self,
+        id: int,
+        first_name: str,
+        last_name: str,
+        email: str,
+        access_level: AccessLevel,
+        query_permission: bool,
+        created_at: datetime,
+        last_login: Optional[datetime],
+        session_id: int,
+        session_expires_at: datetime
+    ):
+        self.id = id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.access_level = access_level
+        self.query_permission = query_permission
+        self.created_at = created_at
+        self.last_login = last_login
+        self.session_id = session_id
+        self.session_expires_at = session_expires_at
+
+    def __repr__(self) -> str:
+        return f"<SessionUser(id={self.id}, email='{self.email}', access_level='{self.access_level}')>"
+
+    @property
+    def full_name(self) -> str:
+        """Get user's full name."""
+        return f"{self.first_name} {self.last_name}"
+
+    def is_admin(self) -> bool:
+        """Check if user has admin privileges."""
+        return self.access_level in [AccessLevel.ADMIN, AccessLevel.SUPER_ADMIN]
+
+    def is_super_admin(self) -> bool:
+        """Check if user has super admin privileges."""
+        return self.access_level == AccessLevel.SUPER_ADMIN
+
+    def is_expired(self) -> bool:
+        """Check if the session this snapshot was taken for has expired."""
+        return datetime.utcnow() > self.session_expires_at
+
+    @staticmethod
+    def from_user(user: User, session_id: int, session_expires_at: datetime) -> "SessionUser":
+        """
+        Take a snapshot of a user.
+
+        Args:
+            user: User loaded from the database
+            session_id: ID of the session the user authenticated with
+            session_expires_at: When the session expires
+
+        Returns:
+            SessionUser snapshot
+        """
+        return SessionUser(
+            id=user.id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            email=user.email,
+            access_level=user.access_level,
+            query_permission=user.query_permission,
+            created_at=user.created_at,
+            last_login=user.last_login,
+            session_id=session_id,
+            session_expires_at=session_expires_at
+        )
+
+    def to_dict(self) -> dict:
+        """Serialize to JSON-compatible values (for shared cache backends)."""
+        return {
+            "id": self.id,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "email": self.email,
+            "access_level": self.access_level.value,
+            "query_permission": self.query_permission,
+            "created_at": self.created_at.isoformat(),
+            "last_login": self.last_login.isoformat() if self.last_login else None,
+            "session_id": self.session_id,
+            "session_expires_at": self.session_expires_at.isoformat()
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "SessionUser":
+        """Inverse of to_dict."""
+        return SessionUser(
+            id=data["id"],
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+            email=data["email"],
+            access_level=AccessLevel(data["access_level"]),
+            query_permission=data["query_permission"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            last_login=datetime.fromisoformat(data["last_login"]) if data["last_login"] else None,
+            session_id=data["session_id"],
+            session_expires_at=datetime.fromisoformat(data["session_expires_at"])
+        )
+
+
+class SessionCache:
+    """Cache of session key -> SessionUser, with per-user invalidation."""
+
+    @staticmethod
+    def _session_cache_key(session_key: str) -> str:
+        # Session keys are credentials; never use them verbatim as (possibly shared) cache keys
+        return "session:" + hashlib.sha256(session_key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _user_cache_key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def get(session_key: str) -> Optional[SessionUser]:
+        """
+        Get the cached user for a session.
+
+        Args:
+            session_key: Session key from cookie
+
+        Returns:
+            SessionUser if cached and the session has not expired, None otherwise
+        """
+        if not SESSION_CACHE_ENABLED:
+            return None
+        data = session_cache.get(SessionCache._session_cache_key(session_key))
+        if data is None:
+            return None
+        user = SessionUser.from_dict(data)
+        if user.is_expired():
+            SessionCache.invalidate(session_key)
+            return None
+        return user
+
+    @staticmethod
+    def set(session_key: str, user: SessionUser) -> None:
+        """
+        Cache the user for a session, expiring no later than the session itself.
+
+        Args:
+            session_key: Session key from cookie
+            user: Snapshot of the session's user
+        """
+        if not SESSION_CACHE_ENABLED:
+            return
+        remaining = (user.session_expires_at - datetime.utcnow()).total_seconds()
+        if remaining <= 0:
+            return
+        ttl = min(SESSION_CACHE_TTL_SECONDS, remaining)
+        cache_key = SessionCache._session_cache_key(session_key)
+        session_cache.set(cache_key, user.to_dict(), ttl_seconds=ttl)
+
+        # Remember which entries belong to the user so invalidate_user can drop them all
+        user_key = SessionCache._user_cache_key(user.id)
+        session_keys = session_cache.get(user_key) or []
+        if cache_key not in session_keys:
+            session_keys.append(cache_key)
+        session_cache.set(user_key, session_keys)
+
+    @staticmethod
+    def invalidate(session_key: str) -> None:
+        """
+        Drop a single session.
+
+        Args:
+            session_key: Session key from cookie
+        """
+        session_cache.delete(SessionCache._session_cache_key(session_key))
+
+    @staticmethod
+    def invalidate_user(user_id: int) -> None:
+        """
+        Drop every cached session of a user (on login and logout, so no
+        session serves a stale snapshot of the user).
+
+        Args:
+            user_id: User ID
+        """
+        user_key = SessionCache._user_cache_key(user_id)
+        for cache_key in session_cache.get(user_key) or []:
+            session_cache.delete(cache_key)
+        session_cache.delete(user_key)
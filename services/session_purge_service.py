@@ -0,0 +1,101 @@
+"""
+Periodic removal of expired sessions.
+
+Session validation never writes, so expired rows are left in the sessions
+table until this job deletes them. Rows are deleted in small batches (each its
+own transaction) to keep locks and WAL bursts short, and SKIP LOCKED lets
+several API processes run the job at the same time without contending.
+"""
+
+import asyncio
+import os
+import traceback
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db_config import AsyncSessionLocal
+from models.user_session import UserSession
+from .metrics import Metrics
+
+SESSION_PURGE_INTERVAL_SECONDS = float(os.getenv("SESSION_PURGE_INTERVAL_SECONDS", "3600"))
+SESSION_PURGE_BATCH_SIZE = int(os.getenv("SESSION_PURGE_BATCH_SIZE", "1000"))
+
+
+class SessionPurgeService:
+    """Service for deleting expired sessions in the background."""
+
+    _task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def purge_expired_sessions(db: AsyncSession, batch_size: int = SESSION_PURGE_BATCH_SIZE) -> int:
+        """
+        Delete all sessions that expired before now, one batch per transaction.
+
+        Args:
+            db: Database session
+            batch_size: Maximum rows deleted per transaction
+
+        Returns:
+            Number of sessions deleted
+        """
+        cutoff = datetime.utcnow()
+        total = 0
+        while True:
+            expired = (
+                select(UserSession.id)
+                    .where(UserSession.expires_at < cutoff)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                    .scalar_subquery()
+            )
+            result = await db.execute(
+                delete(UserSession)
+                    .where(UserSession.id.in_(expired))
+                    .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        Metrics.increment("sessions.purged", total)
+        return total
+
+    @staticmethod
+    async def _purge_loop(interval_seconds: float) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    purged = await SessionPurgeService.purge_expired_sessions(db)
+                if purged:
+                    print(f"Purged {purged} expired sessions")
+            except Exception as e:
+                print(f"Session purge failed: {str(e)}")
+                traceback.print_exc()
+            await asyncio.sleep(interval_seconds)
+
+    @staticmethod
+    def start(interval_seconds: float = SESSION_PURGE_INTERVAL_SECONDS) -> None:
+        """
+        Start the purge loop on the running event loop.
+
+        Args:
+            interval_seconds: Seconds between purges (0 disables the job)
+        """
+        if SessionPurgeService._task or interval_seconds <= 0:
+            return
+        SessionPurgeService._task = asyncio.create_task(SessionPurgeService._purge_loop(interval_seconds))
+
+    @staticmethod
+    async def stop() -> None:
+        """Cancel the purge loop."""
+        task = SessionPurgeService._task
+        if task is None:
+            return
+        SessionPurgeService._task = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,117 @@
+"""
+Token counting with cached tiktoken encoders.
+
+Building an encoder loads and parses its BPE ranks, so encoders are created
+once per model and reused for the lifetime of the process. tiktoken downloads
+the rank files on first use; set TIKTOKEN_CACHE_DIR to a pre-populated
+directory on hosts without outbound network access. A failed load is not
+cached: it is retried after TOKENIZER_RETRY_SECONDS, and counts are estimated
+in the meantime. Call TokenCounter.warm at startup so the first request does
+not pay for the load.
+"""
+
+from typing import Optional
+import os
+import threading
+import time
+import traceback
+import tiktoken
+
+# Used for models tiktoken does not know about
+FALLBACK_ENCODING = "cl100k_base"
+
+# Rough characters-per-token ratio for English, used only if no encoder can be loaded
+CHARS_PER_TOKEN_ESTIMATE = 4
+
+# Wait at least this long before trying to load a tokenizer again after a failure
+TOKENIZER_RETRY_SECONDS = float(os.getenv("TOKENIZER_RETRY_SECONDS", "60"))
+
+_encoders: dict[str, tiktoken.Encoding] = {}
+_failed_at: dict[str, float] = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(model: str) -> Optional[tiktoken.Encoding]:
+    """
+    Get the (cached) tokenizer for a model.
+
+    Args:
+        model: OpenAI model name, e.g. "text-embedding-3-small"
+
+    Returns:
+        tiktoken encoding for the model, or None if it could not be loaded
+        (loading is retried after TOKENIZER_RETRY_SECONDS)
+    """
+    encoder = _encoders.get(model)
+    if encoder is not None:
+        return encoder
+
+    with _encoders_lock:
+        encoder = _encoders.get(model)
+        if encoder is not None:
+            return encoder
+        failed_at = _failed_at.get(model)
+        if failed_at is not None and time.monotonic() - failed_at < TOKENIZER_RETRY_SECONDS:
+            return None
+        try:
+            try:
+                encoder = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoder = tiktoken.get_encoding(FALLBACK_ENCODING)
+        except Exception as e:
+            _failed_at[model] = time.monotonic()
+            print(f"⚠️  Warning: Could not load tokenizer for {model}, estimating token counts for {TOKENIZER_RETRY_SECONDS:.0f}s: {e}")
+            traceback.print_exc()
+            return None
+        _encoders[model] = encoder
+        _failed_at.pop(model, None)
+        return encoder
+
+
+class TokenCounter:
+    """Counts tokens the same way the OpenAI API does."""
+
+    @staticmethod
+    def warm(models: list[str]) -> None:
+        """
+        Load the tokenizers for the given models ahead of the first request.
+
+        Args:
+            models: OpenAI model names
+        """
+        for model in models:
+            get_encoder(model)
+
+    @staticmethod
+    def count(text: str, model: str) -> int:
+        """
+        Count the tokens in a text.
+
+        Args:
+            text: Text to tokenize
+            model: Model whose tokenizer should be used
+
+        Returns:
+            Number of tokens
+        """
+        encoder = get_encoder(model)
+        if encoder is None:
+            return len(text) // CHARS_PER_TOKEN_ESTIMATE + 1
+        return len(encoder.encode_ordinary(text))
+
+    @staticmethod
+    def count_many(texts: list[str], model: str) -> list[int]:
+        """
+        Count the tokens in many texts at once (tokenized in parallel by tiktoken).
+
+        Args:
+            texts: Texts to tokenize
+            model: Model whose tokenizer should be used
+
+        Returns:
+            Token count for each text, in order
+        """
+        encoder = get_encoder(model)
+        if encoder is None:
+            return [len(text) // CHARS_PER_TOKEN_ESTIMATE + 1 for text in texts]
+        return [len(tokens) for tokens in encoder.encode_ordinary_batch(texts)]
@@ -0,0 +1,70 @@
+"""
+In-memory LRU/TTL cache (no Redis needed).
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import cache
+from services.cache import InMemoryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for expiry checks."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    store = InMemoryCache("test_ttl", max_size=10, ttl_seconds=5)
+    store.set("key", "value")
+    clock.value += 4.9
+    assert store.get("key") == "value"
+    clock.value += 0.2
+    assert store.get("key") is None
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    store = InMemoryCache("test_ttl_override", max_size=10, ttl_seconds=5)
+    store.set("short", 1, ttl_seconds=1)
+    store.set("default", 2)
+    clock.value += 2
+    assert store.get("short") is None
+    assert store.get("default") == 2
+
+
+def test_no_ttl_never_expires(clock):
+    store = InMemoryCache("test_no_ttl", max_size=10)
+    store.set("key", "value")
+    clock.value += 10 ** 9
+    assert store.get("key") == "value"
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = InMemoryCache("test_lru", max_size=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    # Reading "a" makes "b" the least recently used entry
+    assert store.get("a") == 1
+    store.set("c", 3)
+    assert store.get("b") is None
+    assert store.get("a") == 1
+    assert store.get("c") == 3
+
+
+def test_delete_and_clear():
+    store = InMemoryCache("test_delete", max_size=10)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.delete("a")
+    store.delete("missing")
+    assert store.get("a") is None
+    store.clear()
+    assert store.get("b") is None
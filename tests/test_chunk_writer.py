@@ -0,0 +1,87 @@
+"""
+The binary COPY payload for chunks decodes to the rows that were encoded (no database needed).
+"""
+
+import os
+import struct
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chunk_writer import ChunkWriter, CHUNK_COLUMNS
+
+
+def decode_copy_payload(payload: bytes):
+    """Parse a PGCOPY binary stream into rows of raw field bytes, checking header and trailer."""
+    assert payload[:11] == b"PGCOPY\n\xff\r\n\x00"
+    flags, extension_length = struct.unpack_from(">ii", payload, 11)
+    assert flags == 0
+    assert extension_length == 0
+    offset = 19
+
+    rows = []
+    while True:
+        (field_count,) = struct.unpack_from(">h", payload, offset)
+        offset += 2
+        if field_count == -1:
+            break
+        fields = []
+        for _ in range(field_count):
+            (length,) = struct.unpack_from(">i", payload, offset)
+            offset += 4
+            fields.append(payload[offset:offset + length])
+            offset += length
+        rows.append(fields)
+
+    assert offset == len(payload), "trailer must end the stream"
+    return rows
+
+
+def decode_vector(field: bytes) -> np.ndarray:
+    """pgvector binary form: dimensions (uint16), unused (uint16), big-endian float32s."""
+    dimensions, unused = struct.unpack_from(">HH", field, 0)
+    assert unused == 0
+    assert len(field) == 4 + 4 * dimensions
+    return np.frombuffer(field, dtype=">f4", offset=4)
+
+
+def test_copy_payload_round_trips():
+    chunk_texts = ["Ask about budget early.", "Silence is a tool — use it.", ""]
+    embeddings = [
+        np.random.default_rng(index).standard_normal(1536).astype(np.float32)
+        for index in range(len(chunk_texts))
+    ]
+
+    rows = decode_copy_payload(ChunkWriter.encode_copy_rows(42, chunk_texts, embeddings, False))
+
+    assert len(rows) == len(chunk_texts)
+    for index, (fields, chunk_text, embedding) in enumerate(zip(rows, chunk_texts, embeddings)):
+        # One field per column, in CHUNK_COLUMNS order
+        assert len(fields) == len(CHUNK_COLUMNS.split(", ")) == 5
+        transcript_id, chunk_index, text, vector, active = fields
+
+        assert len(transcript_id) == 4 and struct.unpack(">i", transcript_id)[0] == 42
+        assert len(chunk_index) == 4 and struct.unpack(">i", chunk_index)[0] == index
+        assert text.decode("utf-8") == chunk_text
+        decoded = decode_vector(vector)
+        assert decoded.shape == (1536,)
+        np.testing.assert_array_equal(decoded, embedding)
+        assert active == b"\x00"
+
+
+def test_active_flag_is_one_byte_true():
+    rows = decode_copy_payload(ChunkWriter.encode_copy_rows(1, ["text"], [np.ones(3, dtype=np.float32)], True))
+    assert rows[0][4] == b"\x01"
+    np.testing.assert_array_equal(decode_vector(rows[0][3]), np.ones(3, dtype=np.float32))
+
+
+def test_empty_payload_is_header_and_trailer_only():
+    assert decode_copy_payload(ChunkWriter.encode_copy_rows(1, [], [], True)) == []
+
+
+def test_write_rejects_mismatched_embeddings():
+    with pytest.raises(ValueError):
+        ChunkWriter.write(None, 1, ["a", "b"], [np.zeros(3, dtype=np.float32)])
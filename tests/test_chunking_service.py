@@ -0,0 +1,49 @@
+"""
+Packing chunks into embedding batches (no network or database needed).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import chunking_service
+from services.chunking_service import ChunkingService
+
+
+@pytest.fixture(autouse=True)
+def word_token_counter(monkeypatch):
+    """Count a token per word so batch limits are easy to reason about."""
+    monkeypatch.setattr(
+        chunking_service.TokenCounter,
+        "count_many",
+        staticmethod(lambda texts, model=None: [len(text.split()) for text in texts])
+    )
+
+
+def words(count: int, word: str = "w") -> str:
+    return " ".join([word] * count)
+
+
+def test_pack_batches_respects_token_limit_and_order():
+    texts = [words(4, "a"), words(4, "b"), words(4, "c"), words(1, "d")]
+    batches = ChunkingService.pack_batches(texts, max_tokens=8, max_inputs=100)
+    assert batches == [[texts[0], texts[1]], [texts[2], texts[3]]]
+
+
+def test_pack_batches_respects_input_limit():
+    texts = [words(1, str(index)) for index in range(5)]
+    batches = ChunkingService.pack_batches(texts, max_tokens=1000, max_inputs=2)
+    assert batches == [texts[0:2], texts[2:4], texts[4:5]]
+
+
+def test_oversized_chunk_gets_its_own_batch():
+    texts = [words(2, "a"), words(20, "big"), words(2, "c")]
+    batches = ChunkingService.pack_batches(texts, max_tokens=10, max_inputs=100)
+    assert batches == [[texts[0]], [texts[1]], [texts[2]]]
+
+
+def test_pack_batches_empty_input():
+    assert ChunkingService.pack_batches([], max_tokens=10, max_inputs=10) == []
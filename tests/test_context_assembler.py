@@ -0,0 +1,41 @@
+"""
+Merging overlapping neighbour chunks into one passage (no database needed).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.context_assembler import ContextAssembler, MIN_OVERLAP_CHARS
+
+OVERLAP = "so always confirm the budget before you send a proposal. "
+FIRST = "Discovery calls set the tone for the deal, " + OVERLAP
+SECOND = OVERLAP + "Then agree on a decision date with every stakeholder."
+
+
+def test_overlap_length_finds_shared_text():
+    assert ContextAssembler.overlap_length(FIRST, SECOND) == len(OVERLAP)
+
+
+def test_overlap_length_ignores_short_coincidental_matches():
+    shared = "x" * (MIN_OVERLAP_CHARS - 1)
+    assert ContextAssembler.overlap_length("start " + shared, shared + " end") == 0
+
+
+def test_overlap_length_respects_max_overlap():
+    assert ContextAssembler.overlap_length(FIRST, SECOND, max_overlap=len(OVERLAP) - 1) < len(OVERLAP)
+
+
+def test_merge_texts_keeps_overlap_once():
+    merged = ContextAssembler.merge_texts([FIRST, SECOND])
+    assert merged == FIRST + SECOND[len(OVERLAP):]
+    assert merged.count(OVERLAP) == 1
+
+
+def test_merge_texts_separates_chunks_without_overlap():
+    assert ContextAssembler.merge_texts(["First chunk.", "Second chunk."]) == "First chunk.\nSecond chunk."
+
+
+def test_merge_texts_single_chunk_is_unchanged():
+    assert ContextAssembler.merge_texts([FIRST]) == FIRST
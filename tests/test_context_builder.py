@@ -0,0 +1,54 @@
+"""
+Packing passages into the prompt's token budget (no database needed).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import context_builder
+from services.context_assembler import ContextPassage
+from services.context_builder import ContextBuilder
+
+
+def count_words(text: str, model: str = None) -> int:
+    return len(text.split())
+
+
+@pytest.fixture(autouse=True)
+def word_token_counter(monkeypatch):
+    """Count a token per word so budgets are easy to reason about."""
+    monkeypatch.setattr(context_builder.TokenCounter, "count", staticmethod(count_words))
+
+
+def passage(rank: int, words: int) -> ContextPassage:
+    return ContextPassage(rank, f"Trainer {rank}", [rank], 0, 0, " ".join([f"w{rank}"] * words), rank)
+
+
+def test_build_stays_within_budget_and_keeps_order():
+    passages = [passage(0, 10), passage(1, 50), passage(2, 10), passage(3, 10)]
+    context, stats = ContextBuilder.build(passages, "gpt-4o-mini", token_budget=60)
+
+    assert stats["tokens"] <= 60
+    assert count_words(context) == stats["tokens"]
+    # The passage that doesn't fit is skipped; later, smaller ones still get in, in order
+    assert stats["passages_used"] == 3
+    assert stats["passages_skipped"] == 1
+    assert context.index("w0") < context.index("w2") < context.index("w3")
+    assert "w1" not in context
+
+
+def test_build_numbers_passages_by_position():
+    context, _ = ContextBuilder.build([passage(0, 60), passage(1, 5), passage(2, 5)], "gpt-4o-mini", token_budget=40)
+    assert "Chunk 0:\nTrainer: Trainer 1" in context
+    assert "Chunk 1:\nTrainer: Trainer 2" in context
+
+
+def test_build_with_nothing_that_fits():
+    context, stats = ContextBuilder.build([passage(0, 100)], "gpt-4o-mini", token_budget=10)
+    assert context == context_builder.PASSAGE_SEPARATOR
+    assert stats["passages_used"] == 0
+    assert stats["passages_skipped"] == 1
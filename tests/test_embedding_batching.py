@@ -0,0 +1,90 @@
+"""
+Concurrent embedding batches against the local fake embedding server (no network).
+"""
+
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import openai
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import fake_embedding_server
+from services import chunking_service
+from services.chunking_service import ChunkingService
+
+TEXTS = [f"Chunk {index}: objection handling, part {index}." for index in range(10)]
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    """Point the shared OpenAI client at the fake server and pack two texts per batch."""
+    monkeypatch.setattr(fake_embedding_server, "settings", {"latency": 0.0, "rate_limit_every": 0, "retry_after": 0.01})
+    monkeypatch.setattr(fake_embedding_server, "request_counter", itertools.count(1))
+    client = openai.OpenAI(
+        api_key="fake",
+        base_url="http://testserver/v1",
+        max_retries=0,
+        http_client=TestClient(fake_embedding_server.app)
+    )
+    monkeypatch.setattr(chunking_service.OpenAIClientProvider, "get_client", staticmethod(lambda max_retries=None: client))
+
+    pack_batches = ChunkingService.pack_batches
+    monkeypatch.setattr(ChunkingService, "pack_batches", staticmethod(lambda texts: pack_batches(texts, max_inputs=2)))
+    monkeypatch.setattr(ChunkingService, "_rate_limited_until", 0.0)
+    return fake_embedding_server.settings
+
+
+def assert_embeddings_match(embeddings):
+    assert len(embeddings) == len(TEXTS)
+    for text, embedding in zip(TEXTS, embeddings):
+        np.testing.assert_allclose(embedding, fake_embedding_server.fake_embedding(text))
+
+
+def test_concurrent_batches_keep_input_order(fake_server):
+    fake_server["latency"] = 0.01
+    assert_embeddings_match(ChunkingService.embed_texts(TEXTS, concurrency=4))
+
+
+def test_batches_finishing_out_of_order_keep_input_order(monkeypatch):
+    def slow_first_batches(batch):
+        # Earlier batches take longer, so they complete last
+        time.sleep(0.01 * (len(TEXTS) - TEXTS.index(batch[0])))
+        return [fake_embedding_server.fake_embedding(text) for text in batch]
+
+    pack_batches = ChunkingService.pack_batches
+    monkeypatch.setattr(ChunkingService, "pack_batches", staticmethod(lambda texts: pack_batches(texts, max_inputs=2)))
+    monkeypatch.setattr(ChunkingService, "embed_batch_with_retry", staticmethod(slow_first_batches))
+    completed = []
+    embeddings = ChunkingService.embed_texts(TEXTS, concurrency=5, on_batch=lambda batch, _: completed.append(batch[0]))
+
+    assert completed != sorted(completed, key=TEXTS.index)
+    assert_embeddings_match(embeddings)
+
+
+def test_rate_limited_batches_are_retried(fake_server):
+    fake_server["rate_limit_every"] = 3
+    embeddings = ChunkingService.embed_texts(TEXTS, concurrency=4)
+
+    assert_embeddings_match(embeddings)
+    # 5 batches succeeded; every third request was answered with a 429 and retried
+    assert next(fake_embedding_server.request_counter) - 1 > len(TEXTS) // 2
+
+
+def test_rate_limit_sets_shared_backoff(fake_server, monkeypatch):
+    fake_server["rate_limit_every"] = 1
+    monkeypatch.setattr(chunking_service, "EMBEDDING_MAX_RETRIES", 2)
+    sleeps = []
+    monkeypatch.setattr(chunking_service.time, "sleep", lambda seconds: sleeps.append(seconds))
+
+    with pytest.raises(openai.RateLimitError):
+        ChunkingService.embed_batch_with_retry(TEXTS[:2])
+
+    # Retry-After from the 429 is honoured before each retry, then the last error surfaces
+    assert sleeps.count(0.01) >= 2
+    assert ChunkingService._rate_limited_until > 0
@@ -0,0 +1,43 @@
+"""
+Maximal marginal relevance selection (pure NumPy, no database needed).
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.mmr_service import MMRService
+
+QUERY = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+
+
+def unit(x: float, y: float, z: float = 0.0) -> np.ndarray:
+    vector = np.array([x, y, z], dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_lambda_one_keeps_relevance_order():
+    candidates = [unit(0.2, 1.0), unit(1.0, 0.1), unit(0.6, 1.0), unit(1.0, 0.5)]
+    selected = MMRService.select(QUERY, candidates, k=3, lambda_mult=1.0)
+    assert selected == [1, 3, 2]
+
+
+def test_near_duplicates_are_suppressed():
+    best = unit(1.0, 0.1, 0.0)
+    candidates = [best, best.copy(), unit(1.0, 0.0, 0.6), unit(0.1, 1.0, 0.0)]
+    selected = MMRService.select(QUERY, candidates, k=2, lambda_mult=0.5)
+    # The exact duplicate of the best chunk loses to a less relevant but different one
+    assert selected == [0, 2]
+
+
+def test_ranked_candidates_follow_given_order_at_lambda_one():
+    candidates = [unit(0.1, 1.0), unit(1.0, 0.0), unit(0.5, 1.0), unit(0.9, 0.3)]
+    assert MMRService.select(QUERY, candidates, k=3, lambda_mult=1.0, ranked=True) == [0, 1, 2]
+
+
+def test_returns_everything_when_k_covers_all_candidates():
+    candidates = [unit(1.0, 0.0), unit(0.0, 1.0)]
+    assert MMRService.select(QUERY, candidates, k=5) == [0, 1]
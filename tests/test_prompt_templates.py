@@ -0,0 +1,49 @@
+"""
+The prompt prefix must be byte-identical across queries for provider prompt caching.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.prompt_templates import get_prompt_template, PROMPT_TEMPLATES
+
+
+def render_two_queries(template):
+    first = template.render_messages("Chunk 0:\nTrainer: Alice\nChunk: Ask about budget early.\n", "How do I handle price objections?")
+    second = template.render_messages("Chunk 0:\nTrainer: Bob\nChunk: Silence is a tool.\n", "What should I say when they go quiet?")
+    return first, second
+
+
+def test_system_message_is_byte_identical_across_queries():
+    first, second = render_two_queries(get_prompt_template())
+    assert first[0]["role"] == second[0]["role"] == "system"
+    assert first[0]["content"].encode("utf-8") == second[0]["content"].encode("utf-8")
+
+
+def test_only_trailing_context_and_question_differ():
+    template = get_prompt_template()
+    first, second = render_two_queries(template)
+
+    first_prompt = "".join(message["content"] for message in first).encode("utf-8")
+    second_prompt = "".join(message["content"] for message in second).encode("utf-8")
+    static_prefix = (template.system + template.context_heading + "\n").encode("utf-8")
+
+    # Everything up to the context is shared and static...
+    assert first_prompt.startswith(static_prefix)
+    assert second_prompt.startswith(static_prefix)
+    # ...and the first differing byte comes after it
+    shared = next(index for index, (a, b) in enumerate(zip(first_prompt, second_prompt)) if a != b)
+    assert shared >= len(static_prefix)
+
+    for messages, question in zip((first, second), ("How do I handle price objections?", "What should I say when they go quiet?")):
+        user_message = messages[-1]["content"]
+        assert user_message.startswith(template.context_heading)
+        assert user_message.endswith(template.question_heading + "\n" + question)
+
+
+def test_every_registered_template_keeps_a_static_system_message():
+    for template in PROMPT_TEMPLATES.values():
+        first, second = render_two_queries(template)
+        assert first[0] == second[0]
@@ -0,0 +1,41 @@
+"""
+BM25 reranking over a candidate set (no model or database needed).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.reranker import BM25Reranker
+
+TEXTS = [
+    "Follow up within a day of the demo.",
+    "When they raise a price objection, restate the value before discussing price.",
+    "Price comes up late in most deals.",
+    "Build rapport by asking about their goals.",
+]
+
+
+def test_bm25_ranks_texts_sharing_query_terms_first():
+    scores = BM25Reranker().score("handle price objection", TEXTS)
+    assert len(scores) == len(TEXTS)
+    assert scores[1] > scores[2] > 0
+    assert scores[0] == 0.0
+    assert scores[3] == 0.0
+
+
+def test_bm25_rare_terms_outweigh_common_ones():
+    texts = ["price price", "price objection", "price"]
+    scores = BM25Reranker().score("price objection", texts)
+    assert max(range(len(texts)), key=scores.__getitem__) == 1
+
+
+def test_bm25_is_case_insensitive_and_ignores_punctuation():
+    scores = BM25Reranker().score("PRICE!", ["the price.", "no match"])
+    assert scores[0] > 0
+    assert scores[1] == 0.0
+
+
+def test_bm25_handles_empty_candidates():
+    assert BM25Reranker().score("price", []) == []
@@ -0,0 +1,48 @@
+"""
+Session snapshots survive serialization for shared cache backends (no database needed).
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.user import AccessLevel
+from services.session_cache import SessionUser
+
+
+def make_user(last_login):
+    return SessionUser(
+        id=7,
+        first_name="Ada",
+        last_name="Lovelace",
+        email="ada@example.com",
+        access_level=AccessLevel.ADMIN,
+        query_permission=True,
+        created_at=datetime(2025, 1, 2, 3, 4, 5, 678901),
+        last_login=last_login,
+        session_id=42,
+        session_expires_at=datetime(2025, 10, 20, 12, 0, 0)
+    )
+
+
+def assert_same_user(restored: SessionUser, user: SessionUser):
+    for attribute in ("id", "first_name", "last_name", "email", "access_level", "query_permission",
+                      "created_at", "last_login", "session_id", "session_expires_at"):
+        assert getattr(restored, attribute) == getattr(user, attribute), attribute
+
+
+def test_to_dict_from_dict_round_trip_through_json():
+    user = make_user(datetime(2025, 10, 18, 9, 30))
+    # JSON is what the Redis backend stores
+    restored = SessionUser.from_dict(json.loads(json.dumps(user.to_dict())))
+    assert_same_user(restored, user)
+    assert restored.access_level is AccessLevel.ADMIN
+    assert restored.is_admin()
+
+
+def test_round_trip_without_last_login():
+    user = make_user(None)
+    assert_same_user(SessionUser.from_dict(user.to_dict()), user)